@@ -0,0 +1,42 @@
+import itertools
+import types
+from pokelookup_app import App
+from pokelookup_images import ImageCache
+
+
+def prepare_search(pokelookup, image_cache, names):
+    """
+    Returns a function that runs the search worker half of App.search_button_event for the next name in names
+    App._prepare_search only needs these attributes and never touches a widget, so it runs without a display
+    """
+    app = types.SimpleNamespace(pokelookup=pokelookup, image_cache=image_cache, _search_generation=0)
+    names = itertools.cycle(names)
+    return lambda: App._prepare_search(app, next(names), 0)
+
+
+def bench_search_images_cold_loose(benchmark, pokelookup, sprite_files):
+    # a fresh cache every round, so each search reads and decodes its sprite and badges from the loose pngs
+    names = itertools.cycle([p.name for p in pokelookup.pokedex])
+    def setup():
+        image_cache = ImageCache(sprite_dir=sprite_files.sprite_dir, bundle_path=sprite_files.missing_bundle_path)
+        return (prepare_search(pokelookup, image_cache, [next(names)]),), {}
+    benchmark.pedantic(lambda search: search(), setup=setup, rounds=200)
+
+
+def bench_search_images_cold_bundle(benchmark, pokelookup, sprite_files):
+    names = itertools.cycle([p.name for p in pokelookup.pokedex])
+    image_cache = ImageCache(sprite_dir=sprite_files.sprite_dir, bundle_path=sprite_files.bundle_path)
+    def setup():
+        # keep the mapped bundle, only throw away the decoded images
+        fresh = ImageCache(sprite_dir=sprite_files.sprite_dir, bundle_path=sprite_files.missing_bundle_path)
+        fresh.bundle = image_cache.bundle
+        return (prepare_search(pokelookup, fresh, [next(names)]),), {}
+    benchmark.pedantic(lambda search: search(), setup=setup, rounds=200)
+
+
+def bench_search_images_warm(benchmark, pokelookup, sprite_files):
+    image_cache = ImageCache(sprite_dir=sprite_files.sprite_dir, bundle_path=sprite_files.bundle_path)
+    search = prepare_search(pokelookup, image_cache, [p.name for p in pokelookup.pokedex])
+    for _ in pokelookup.pokedex:
+        search()
+    assert benchmark(search).pokemon is not None
@@ -0,0 +1,20 @@
+from pokelookup_core import PokeLookup
+
+
+def bench_load_pokedex_json(benchmark, pokedex_files):
+    # no store, so every pokemon is projected from the raw PokeAPI json
+    pokelookup = PokeLookup(json_path=pokedex_files.json_path, store_path=pokedex_files.store_path + ".missing", load=False,
+                            generation=pokedex_files.generation)
+    pokedex = benchmark(pokelookup._load_pokedex)
+    assert len(pokedex) == pokedex_files.count
+
+
+def bench_load_pokedex_store(benchmark, pokedex_files):
+    pokelookup = PokeLookup(json_path=pokedex_files.json_path, store_path=pokedex_files.store_path, load=False,
+                            generation=pokedex_files.generation)
+    pokedex = benchmark(pokelookup._load_pokedex)
+    assert len(pokedex) == pokedex_files.count
+
+
+def bench_build_indexes(benchmark, pokelookup):
+    benchmark(pokelookup._build_indexes)
@@ -0,0 +1,29 @@
+import itertools
+
+
+def misspell(name: str) -> str:
+    """
+    Swaps two letters in the middle of name so it only matches fuzzily, e.g. synthmon-25 -> synhtmon-25
+    """
+    i = len(name) // 3
+    return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+
+
+def bench_find_pokemon_exact(benchmark, pokelookup):
+    queries = itertools.cycle([p.name for p in pokelookup.pokedex])
+    assert benchmark(lambda: pokelookup.find_pokemon(next(queries))) is not None
+
+
+def bench_find_pokemon_number(benchmark, pokelookup):
+    queries = itertools.cycle([str(p.id) for p in pokelookup.pokedex])
+    assert benchmark(lambda: pokelookup.find_pokemon(next(queries))) is not None
+
+
+def bench_find_pokemon_fuzzy(benchmark, pokelookup):
+    queries = itertools.cycle([misspell(p.name) for p in pokelookup.pokedex])
+    assert benchmark(lambda: pokelookup.find_pokemon(next(queries))) is not None
+
+
+def bench_match_many_fuzzy(benchmark, pokelookup):
+    queries = [misspell(p.name) for p in pokelookup.pokedex]
+    assert None not in benchmark(pokelookup.match_many, queries, workers=1)
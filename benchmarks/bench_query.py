@@ -0,0 +1,23 @@
+from pokelookup_core import PokeType
+from pokelookup_query import TypeIndex
+
+
+# "immune to ground and resistant to fire", plus a compound query using every kind of condition
+SIMPLE = [("immune", PokeType.GROUND), ("resists", PokeType.FIRE)]
+COMPOUND = dict(all_of=[("resists", PokeType.GRASS)], any_of=[("weak", PokeType.ICE), ("4x", PokeType.ELECTRIC)],
+                none_of=[("weak", PokeType.ROCK), ("neutral", PokeType.STEEL)])
+
+
+def bench_type_index_build(benchmark, pokelookup):
+    pokelookup.type_charts # only the bitsets, not the type charts they're built from
+    benchmark(TypeIndex, pokelookup)
+
+
+def bench_select(benchmark, pokelookup):
+    index = TypeIndex(pokelookup)
+    benchmark(index.select, SIMPLE)
+
+
+def bench_select_compound(benchmark, pokelookup):
+    index = TypeIndex(pokelookup)
+    benchmark(lambda: index.select(**COMPOUND))
@@ -0,0 +1,11 @@
+import itertools
+from pokelookup_core import NUM_TYPES, get_generation, get_type_charts
+
+
+def bench_get_type_chart(benchmark, pokelookup):
+    pokemon = itertools.cycle(pokelookup.pokedex)
+    assert len(benchmark(lambda: next(pokemon).get_type_chart())) == get_generation(pokelookup.generation).chart_size
+
+
+def bench_get_type_charts(benchmark, pokelookup):
+    assert benchmark(get_type_charts, pokelookup.pokedex).shape == (len(pokelookup.pokedex), NUM_TYPES)
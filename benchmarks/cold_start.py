@@ -0,0 +1,117 @@
+import os
+import sys
+import json
+import argparse
+import tempfile
+import compileall
+import subprocess
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, ROOT)
+from pokelookup_testing import generation_for, write_pokedex
+from pokelookup_core import PokeLookup
+
+
+# imports that are only worth paying for once something needs them, none of these should be pulled in by importing
+# the modules in LAZY_MODULES or by an exact lookup in fast start mode
+HEAVY_MODULES = ["numpy", "rapidfuzz", "requests", "tqdm"]
+LAZY_MODULES = ["pokelookup_core", "pokelookup_batch"]
+# imported for the report only, the app needs customtkinter (and with it PIL) before it can open a window anyway
+REPORT_MODULES = LAZY_MODULES + ["pokelookup_app"]
+
+# run in a fresh interpreter for every sample so nothing is already imported or loaded
+FIRST_QUERY_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+from pokelookup_core import PokeLookup
+imported = time.perf_counter()
+pokelookup = PokeLookup(json_path={json_path!r}, store_path={store_path!r}, generation={generation}, fast_start={fast_start})
+loaded = time.perf_counter()
+pokelookup.find_pokemon("synthmon-25")
+exact = time.perf_counter()
+heavy = [m for m in {heavy!r} if m in sys.modules]
+pokelookup.find_pokemon("synthmn-7")
+fuzzy = time.perf_counter()
+print(json.dumps({{"import": imported - start, "load": loaded - imported, "first_exact": exact - loaded,
+                  "first_fuzzy": fuzzy - exact, "heavy_after_exact": heavy}}))
+"""
+
+
+def import_time(module: str) -> dict:
+    """
+    Imports module in a fresh interpreter under python -X importtime
+
+    Returns:
+        dict: the module's cumulative import time in seconds and which HEAVY_MODULES it pulled in
+    """
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stderr
+    # e.g., "import time:       363 |      83094 | requests", times in microseconds, nested imports are indented
+    cumulative = {}
+    for line in output.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, total, name = line.split("|")
+            if total.strip().isdigit():
+                cumulative[name.strip()] = int(total) / 1e6
+    return {"seconds": cumulative[module], "heavy": [m for m in HEAVY_MODULES if m in cumulative]}
+
+
+def first_query(json_path: str, store_path: str, generation: int, fast_start: bool, runs: int) -> dict:
+    """
+    Measures the median import, load, first exact and first fuzzy lookup times over several fresh processes
+    """
+    script = FIRST_QUERY_SCRIPT.format(root=ROOT, json_path=json_path, store_path=store_path, generation=generation,
+                                       fast_start=fast_start, heavy=HEAVY_MODULES)
+    samples = [json.loads(subprocess.check_output([sys.executable, "-c", script])) for _ in range(runs)]
+    result = {}
+    for stage in ["import", "load", "first_exact", "first_fuzzy"]:
+        seconds = sorted(s[stage] for s in samples)
+        result[stage] = seconds[len(seconds) // 2]
+    result["heavy_after_exact"] = sorted({m for s in samples for m in s["heavy_after_exact"]})
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check import time and first query latency from a cold start, and that heavy imports stay deferred")
+    parser.add_argument("--count", type=int, default=1025, help="number of synthetic pokemon to generate")
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes to sample per mode")
+    args = parser.parse_args()
+
+    # every sample should load bytecode rather than compile, even when PYTHONDONTWRITEBYTECODE is set
+    compileall.compile_dir(ROOT, maxlevels=0, quiet=1)
+
+    failures: List[str] = []
+    print("python -X importtime:")
+    for module in REPORT_MODULES:
+        r = import_time(module)
+        print(f"  {module:>16}: {r['seconds'] * 1000:7.1f} ms  heavy imports: {', '.join(r['heavy']) or 'none'}")
+        if module in LAZY_MODULES and r["heavy"]:
+            failures.append(f"import {module} pulled in {', '.join(r['heavy'])}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "pokemon.json")
+        store_path = os.path.join(tmp, "pokemon.bin")
+        write_pokedex(json_path, args.count)
+        generation = generation_for(args.count)
+        PokeLookup(json_path=json_path, store_path=store_path, load=False)._build_compact_store(json_path, store_path)
+
+        results: Dict[str, dict] = {
+            "eager": first_query(json_path, store_path, generation, False, args.runs),
+            "fast start": first_query(json_path, store_path, generation, True, args.runs),
+        }
+    print(f"first query, {args.count} pokemon (median of {args.runs} runs):")
+    print(f"  {'':>10}  {'import':>9}  {'load':>9}  {'1st exact':>9}  {'1st fuzzy':>9}")
+    for mode, r in results.items():
+        print(f"  {mode:>10}  " + "  ".join(f"{r[stage] * 1000:6.1f} ms" for stage in ["import", "load", "first_exact", "first_fuzzy"]))
+    if results["fast start"]["heavy_after_exact"]:
+        failures.append(f"a fast start exact lookup pulled in {', '.join(results['fast start']['heavy_after_exact'])}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
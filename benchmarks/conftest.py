@@ -0,0 +1,53 @@
+import os
+import sys
+import types
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from pokelookup_testing import generation_for, write_pokedex
+from pokelookup_testing import write_sprites
+from pokelookup_core import PokeLookup
+from pokelookup_sprites import build_sprite_bundle
+
+
+# gen 3 dex and the full national dex
+DEX_SIZES = [386, 1025]
+
+
+@pytest.fixture(scope="session", params=DEX_SIZES, ids=lambda count: f"dex{count}")
+def dex_size(request) -> int:
+    return request.param
+
+
+@pytest.fixture(scope="session")
+def pokedex_files(tmp_path_factory, dex_size) -> types.SimpleNamespace:
+    """
+    A synthetic pokemon.json and the compact store built from it, generated once per dex size
+    """
+    folder = tmp_path_factory.mktemp(f"pokedex{dex_size}")
+    json_path = str(folder / "pokemon.json")
+    store_path = str(folder / "pokemon.bin")
+    write_pokedex(json_path, dex_size)
+    PokeLookup(json_path=json_path, store_path=store_path, load=False)._build_compact_store(json_path, store_path)
+    return types.SimpleNamespace(json_path=json_path, store_path=store_path, count=dex_size, generation=generation_for(dex_size))
+
+
+@pytest.fixture(scope="session")
+def pokelookup(pokedex_files) -> PokeLookup:
+    """
+    A PokeLookup loaded from the compact store with its result cache turned off, so every call does the full lookup
+    """
+    return PokeLookup(json_path=pokedex_files.json_path, store_path=pokedex_files.store_path, cache_size=0, generation=pokedex_files.generation)
+
+
+@pytest.fixture(scope="session")
+def sprite_files(tmp_path_factory, dex_size) -> types.SimpleNamespace:
+    """
+    Placeholder sprites for every pokemon in the synthetic dex, as loose files and as a sprite bundle
+    """
+    folder = tmp_path_factory.mktemp(f"sprites{dex_size}")
+    sprite_dir = str(folder / "sprites")
+    bundle_path = str(folder / "sprites.bundle")
+    write_sprites(sprite_dir, dex_size)
+    build_sprite_bundle(sprite_dir, bundle_path)
+    return types.SimpleNamespace(sprite_dir=sprite_dir, bundle_path=bundle_path, missing_bundle_path=str(folder / "missing.bundle"))
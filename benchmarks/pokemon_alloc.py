@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from pokelookup_testing import generation_for, write_pokedex
+from pokelookup_core import PokeLookup
+
+
+def count_allocations(fn, queries) -> float:
+    """
+    Returns the average number of memory blocks still allocated per call after calling fn for every query
+    Results are kept alive until the end so blocks aren't freed and reused between calls
+    """
+    results = []
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for q in queries:
+        results.append(fn(q))
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    # the results list itself holds one pointer per call, don't count its growth against fn
+    return (blocks - 1) / len(queries)
+
+
+def time_per_call(fn, queries, repeat: int) -> float:
+    """
+    Returns the best average seconds per call over repeat passes through queries
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for q in queries:
+            fn(q)
+        best = min(best, (time.perf_counter() - start) / len(queries))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure allocations and time per exact find_pokemon and get_type_chart call")
+    parser.add_argument("--count", type=int, default=386, help="number of synthetic pokemon")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "pokemon.json")
+        store_path = os.path.join(tmp, "pokemon.bin")
+        write_pokedex(json_path, args.count, moves=0)
+        # no result cache, so every call does the full lookup
+        pokelookup = PokeLookup(json_path=json_path, store_path=store_path, cache_size=0, generation=generation_for(args.count))
+        queries = [p.name for p in pokelookup.pokedex]
+
+        pokemon = [pokelookup.find_pokemon(q) for q in queries]
+        find_allocs = count_allocations(pokelookup.find_pokemon, queries)
+        find_time = time_per_call(pokelookup.find_pokemon, queries, args.repeat)
+        chart_allocs = count_allocations(lambda p: p.get_type_chart(), pokemon)
+        chart_time = time_per_call(lambda p: p.get_type_chart(), pokemon, args.repeat)
+
+        print(f"find_pokemon (exact): {find_allocs:6.2f} blocks/call retained, {find_time * 1e6:6.2f} us/call")
+        print(f"get_type_chart:       {chart_allocs:6.2f} blocks/call retained, {chart_time * 1e6:6.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
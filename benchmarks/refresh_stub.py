@@ -0,0 +1,107 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, ROOT)
+from pokelookup_testing import StubPokeAPI, check_matches_fresh_load, generation_for, make_pokemon, mutate
+from pokelookup_core import PokeLookup
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check incremental refreshes against a local stub api that answers conditional requests with 304s")
+    parser.add_argument("--count", type=int, default=386, help="number of synthetic pokemon to serve")
+    parser.add_argument("--changes", type=int, default=5, help="pokemon to change on the stub between refreshes")
+    parser.add_argument("--moves", type=int, default=60, help="moves per synthetic record, sets the response size")
+    args = parser.parse_args()
+
+    generation = generation_for(args.count)
+    records = {id: make_pokemon(id, args.moves) for id in range(1, args.count + 1)}
+    changed_ids = sorted({1 + (i * 97) % args.count for i in range(args.changes)})
+    queries = ["synthmon-1", "synthmon-25", f"#{changed_ids[0]}", "synthmn-7", "synthmon-1-renamed", "synthmon-3"]
+    failures = []
+    timings = {}
+
+    with tempfile.TemporaryDirectory() as tmp, StubPokeAPI(records) as stub:
+        json_path = os.path.join(tmp, "pokemon.json")
+        store_path = os.path.join(tmp, "pokemon.bin")
+        cache_dir = os.path.join(tmp, "pokemon_cache")
+
+        start = time.perf_counter()
+        PokeLookup(json_path=json_path, store_path=store_path, load=False, generation=generation)._download_pokemon_data(
+            base_url=stub.base_url, cache_dir=cache_dir, output_path=json_path)
+        timings["full download"] = time.perf_counter() - start
+
+        pokelookup = PokeLookup(json_path=json_path, store_path=store_path, generation=generation)
+        for q in queries:
+            pokelookup.find_pokemon(q)
+            pokelookup.suggest(q)
+        pokelookup.type_charts
+
+        # nothing changed: every request should be a 304 and nothing on disk rewritten
+        mtimes = (os.path.getmtime(json_path), os.path.getmtime(store_path))
+        stub.reset_statuses()
+        start = time.perf_counter()
+        changed = pokelookup.refresh(base_url=stub.base_url, cache_dir=cache_dir)
+        timings["no-op refresh"] = time.perf_counter() - start
+        if changed or stub.statuses != {304: args.count}:
+            failures.append(f"no-op refresh changed {changed} with responses {stub.statuses}")
+        if (os.path.getmtime(json_path), os.path.getmtime(store_path)) != mtimes:
+            failures.append("no-op refresh rewrote pokemon.json or the store")
+
+        # a handful of type changes: only those come back in full and only their cache entries go
+        type_changes = changed_ids[1:]
+        for id in type_changes:
+            stub.set_record(id, mutate(records[id], rename=False))
+        pokelookup.find_pokemon("synthmon-3")
+        cached = pokelookup.get_cache_stats()["size"]
+        stub.reset_statuses()
+        start = time.perf_counter()
+        changed = pokelookup.refresh(base_url=stub.base_url, cache_dir=cache_dir)
+        timings[f"{len(type_changes)} changed"] = time.perf_counter() - start
+        if changed != type_changes or stub.statuses.get(200, 0) != len(type_changes):
+            failures.append(f"refresh after changing {type_changes} reported {changed} with responses {stub.statuses}")
+        dropped = cached - pokelookup.get_cache_stats()["size"]
+        if 3 not in type_changes and pokelookup._find_cache.get("synthmon-3") is None:
+            failures.append("refresh dropped a cached result for a species that didn't change")
+        failures += check_matches_fresh_load(pokelookup, queries)
+
+        # a rename changes fuzzy matches for everything, so the whole cache goes and the prefix index is rebuilt
+        stub.set_record(changed_ids[0], mutate(records[changed_ids[0]], rename=True))
+        changed = pokelookup.refresh(base_url=stub.base_url, cache_dir=cache_dir)
+        if changed != [changed_ids[0]]:
+            failures.append(f"refresh after renaming {changed_ids[0]} reported {changed}")
+        failures += check_matches_fresh_load(pokelookup, queries)
+
+        # the patched store has to be byte for byte what a full rebuild would write
+        with open(store_path, "rb") as f:
+            patched = f.read()
+        rebuilt_path = os.path.join(tmp, "rebuilt.bin")
+        pokelookup._build_compact_store(json_path, rebuilt_path)
+        with open(rebuilt_path, "rb") as f:
+            if f.read() != patched:
+                failures.append("patched store differs from a full rebuild")
+
+    # a server without validators sends everything every time, the content hashes still keep unchanged records from being rewritten
+    with tempfile.TemporaryDirectory() as tmp, StubPokeAPI(records, conditional=False) as stub:
+        json_path = os.path.join(tmp, "pokemon.json")
+        pokelookup = PokeLookup(json_path=json_path, store_path=os.path.join(tmp, "pokemon.bin"), load=False, generation=generation)
+        pokelookup._download_pokemon_data(base_url=stub.base_url, cache_dir=os.path.join(tmp, "pokemon_cache"), output_path=json_path)
+        start = time.perf_counter()
+        changed = pokelookup._refresh_pokemon_data(base_url=stub.base_url, cache_dir=os.path.join(tmp, "pokemon_cache"))
+        timings["refresh, no validators"] = time.perf_counter() - start
+        if changed:
+            failures.append(f"refresh without validators reported unchanged records {sorted(changed)} as changed")
+
+    print(f"{args.count} pokemon, {len(changed_ids)} changed between refreshes, {dropped} cached results dropped for the type changes")
+    for name, seconds in timings.items():
+        print(f"  {name:>24}: {seconds * 1000:8.1f} ms")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import subprocess
+import http.client
+from urllib.parse import quote, urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, ROOT)
+from pokelookup_testing import write_pokedex
+from pokelookup_core import PokeLookup
+
+
+def make_queries(names, count: int, rng: random.Random):
+    """
+    Mix of exact names, typos and pokedex numbers, roughly what users type
+    """
+    queries = []
+    for _ in range(count):
+        name = rng.choice(names)
+        roll = rng.random()
+        if roll < 0.6:
+            queries.append(name)
+        elif roll < 0.9:
+            i = rng.randrange(len(name))
+            queries.append(name[:i] + name[i + 1:]) # drop a character
+        else:
+            queries.append(str(rng.randrange(1, len(names) + 1)))
+    return queries
+
+
+def client(host: str, port: int, queries, batch: int, deadline: float, latencies: list, errors: list):
+    """
+    Sends requests over one keep-alive connection until deadline, recording the latency of each
+    """
+    conn = http.client.HTTPConnection(host, port)
+    rng = random.Random()
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            if batch > 1:
+                conn.request("POST", "/type-chart", body=json.dumps({"queries": rng.sample(queries, batch)}),
+                             headers={"Content-Type": "application/json"})
+            else:
+                conn.request("GET", f"/type-chart?q={quote(rng.choice(queries))}")
+            response = conn.getresponse()
+            response.read()
+            if response.status not in (200, 404):
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(repr(e))
+            conn.close()
+            conn = http.client.HTTPConnection(host, port)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def percentile(sorted_values, p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+def run_load(host: str, port: int, names, clients: int, duration: float, batch: int):
+    queries = make_queries(names, 5000, random.Random(0))
+    latencies = [[] for _ in range(clients)]
+    errors = []
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=client, args=(host, port, queries, batch, deadline, latencies[i], errors)) for i in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    all_latencies = sorted(l for ls in latencies for l in ls)
+    requests = len(all_latencies)
+    print(f"clients {clients}, batch size {batch}, {duration:g}s")
+    print(f"  requests:   {requests} ({len(errors)} errors)")
+    print(f"  throughput: {requests / elapsed:,.0f} req/s, {requests * batch / elapsed:,.0f} lookups/s")
+    if requests:
+        print(f"  latency:    p50 {percentile(all_latencies, 0.50) * 1000:.2f} ms, p99 {percentile(all_latencies, 0.99) * 1000:.2f} ms, "
+              f"max {all_latencies[-1] * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the PokeLookup HTTP server on localhost")
+    parser.add_argument("--url", help="server to test, e.g., http://127.0.0.1:8080. If omitted a server is started on a synthetic pokedex")
+    # more connections than server workers by default, so queueing behind busy workers shows up in the latencies
+    parser.add_argument("--clients", type=int, default=16, help="concurrent keep-alive connections")
+    parser.add_argument("--duration", type=float, default=5, help="seconds to run for")
+    parser.add_argument("--batch", type=int, default=1, help="queries per request, more than 1 uses POST batches")
+    parser.add_argument("--workers", type=int, default=8, help="server worker threads when starting a server")
+    parser.add_argument("--server-args", default="", help="extra arguments for pokelookup_server.py when starting a server")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = None
+        if args.url:
+            url = urlparse(args.url)
+            host, port = url.hostname, url.port
+            names = [f"synthmon-{i}" for i in range(1, 387)]
+            with http.client.HTTPConnection(host, port) as conn:
+                conn.request("GET", "/candidates?q=a&k=1000")
+                names = [c["pokemon"]["name"] for c in json.loads(conn.getresponse().read())] or names
+        else:
+            json_path = os.path.join(tmp, "pokemon.json")
+            store_path = os.path.join(tmp, "pokemon.bin")
+            write_pokedex(json_path, moves=0)
+            PokeLookup(json_path=json_path, store_path=store_path, load=False)._build_compact_store(json_path, store_path)
+            names = [p.name for p in PokeLookup(json_path=json_path, store_path=store_path).pokedex]
+
+            host = "127.0.0.1"
+            server = subprocess.Popen([sys.executable, os.path.join(ROOT, "pokelookup_server.py"), "--host", host, "--port", "0",
+                                       "--workers", str(args.workers), "--json-path", json_path, "--store-path", store_path] + args.server_args.split(),
+                                      stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+            # first line is "Serving <n> pokemon on http://<host>:<port>"
+            port = urlparse(server.stdout.readline().split()[-1]).port
+            # keep draining the server's stdout so it never blocks on a full pipe
+            threading.Thread(target=server.stdout.read, daemon=True).start()
+
+        try:
+            run_load(host, port, names, args.clients, args.duration, args.batch)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import os
+import sys
+import argparse
+import tempfile
+import multiprocessing
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, ROOT)
+from pokelookup_testing import generation_for, write_pokedex
+from pokelookup_core import PokeLookup
+from pokelookup_shm import SharedPokedex, SharedPokeLookup
+
+
+def read_memory() -> dict:
+    """
+    Returns this process's RSS, PSS (shared pages split between the processes sharing them) and USS (private pages) in KiB
+    """
+    with open("/proc/self/smaps_rollup") as f:
+        fields = {line.split(":")[0]: int(line.split()[1]) for line in f if line.rstrip().endswith("kB")}
+    return {"rss": fields["Rss"], "pss": fields["Pss"], "uss": fields["Private_Clean"] + fields["Private_Dirty"]}
+
+
+def worker(mode: str, json_path: str, store_path: str, shared_path: str, generation: int, barrier, results):
+    if mode == "json":
+        pokelookup = PokeLookup(json_path=json_path, store_path=os.path.join(os.path.dirname(json_path), "missing.bin"), generation=generation)
+    elif mode == "store":
+        pokelookup = PokeLookup(json_path=json_path, store_path=store_path, generation=generation)
+    elif mode == "shared":
+        pokelookup = SharedPokeLookup(shared_path)
+    else:
+        pokelookup = None # baseline, just the interpreter and imports
+
+    if pokelookup is not None:
+        # touch everything a serving worker would
+        for q in ["synthmon-1", "synthmon-25", "#150", "synthmn-7", "synthmon-3"]:
+            pokelookup.find_pokemon(q)
+        pokelookup.suggest("synthmon-1")
+        pokelookup.find_candidates("synthmn", 5)
+
+    # measure while every worker is alive so shared pages are split between all of them
+    barrier.wait()
+    results.put(read_memory())
+    barrier.wait()
+
+
+def measure(mode: str, workers: int, json_path: str, store_path: str, shared_path: str, generation: int) -> dict:
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    procs = [context.Process(target=worker, args=(mode, json_path, store_path, shared_path, generation, barrier, results)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    samples = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return {k: sum(s[k] for s in samples) / len(samples) for k in samples[0]}
+
+
+def main():
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        print("this benchmark reads /proc/self/smaps_rollup, so it only runs on linux")
+        sys.exit(1)
+
+    parser = argparse.ArgumentParser(description="Compare per worker memory for private vs shared pokedex copies")
+    parser.add_argument("--count", type=int, default=386, help="number of synthetic pokemon")
+    parser.add_argument("--workers", type=int, default=4, help="worker processes alive at once")
+    parser.add_argument("--moves", type=int, default=60, help="moves per synthetic pokemon, lower it to keep the json mode manageable for big counts")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "pokemon.json")
+        store_path = os.path.join(tmp, "pokemon.bin")
+        write_pokedex(json_path, args.count, args.moves)
+        PokeLookup(json_path=json_path, store_path=store_path, load=False)._build_compact_store(json_path, store_path)
+        generation = generation_for(args.count)
+        shared = SharedPokedex.create(PokeLookup(json_path=json_path, store_path=store_path, generation=generation), os.path.join(tmp, "pokedex.shm"))
+
+        try:
+            print(f"{args.count} pokemon, {args.workers} workers, per worker averages in MiB")
+            print(f"{'mode':<10}{'RSS':>8}{'PSS':>8}{'USS':>8}{'USS over baseline':>20}")
+            baseline = None
+            for mode in ["baseline", "json", "store", "shared"]:
+                m = measure(mode, args.workers, json_path, store_path, shared.path, generation)
+                baseline = baseline or m
+                print(f"{mode:<10}{m['rss'] / 1024:>8.1f}{m['pss'] / 1024:>8.1f}{m['uss'] / 1024:>8.1f}{(m['uss'] - baseline['uss']) / 1024:>20.2f}", flush=True)
+        finally:
+            shared.close()
+            shared.unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from pokelookup_sprites import build_sprite_bundle
+from pokelookup_testing import write_sprites
+
+
+# run in a fresh interpreter for every sample so nothing is cached in process between runs
+MEASURE_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+from pokelookup_core import PokeType
+from pokelookup_images import ImageCache, UNKNOWN_SPRITE_ID
+
+start = time.perf_counter()
+cache = ImageCache(sprite_dir={sprite_dir!r}, bundle_path={bundle_path!r})
+# what the app shows on startup
+cache.get_unknown_type_image()
+cache.get_sprite(UNKNOWN_SPRITE_ID)
+for t in PokeType:
+    cache.get_type_image(t)
+# first search
+cache.get_type_image(None)
+cache.get_sprite({search_id})
+print(json.dumps({{"seconds": time.perf_counter() - start}}))
+"""
+
+
+def drop_page_cache(paths):
+    """
+    Asks the kernel to drop the given files from the page cache so the next read has to go to disk
+    """
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def measure(sprite_dir: str, bundle_path: str, files, cold: bool, runs: int, count: int) -> float:
+    """
+    Returns the median first search latency in seconds over runs fresh processes
+    """
+    root = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+    samples = []
+    for run in range(runs):
+        if cold:
+            drop_page_cache(files)
+        script = MEASURE_SCRIPT.format(root=root, sprite_dir=sprite_dir, bundle_path=bundle_path, search_id=(run * 37) % count + 1)
+        samples.append(json.loads(subprocess.check_output([sys.executable, "-c", script]))["seconds"])
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main():
+    if not hasattr(os, "posix_fadvise"):
+        print("posix_fadvise isn't available on this platform so cold page cache runs can't be measured")
+        sys.exit(1)
+
+    parser = argparse.ArgumentParser(description="Compare first search image latency for loose sprite files vs the sprite bundle")
+    parser.add_argument("--count", type=int, default=386, help="number of pokemon sprites to generate")
+    parser.add_argument("--runs", type=int, default=7, help="fresh processes to sample per mode")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sprite_dir = os.path.join(tmp, "sprites")
+        bundle_path = os.path.join(tmp, "sprites.bundle")
+        write_sprites(sprite_dir, args.count)
+        build_sprite_bundle(sprite_dir, bundle_path)
+        loose_files = [os.path.join(d, f) for d, _, files in os.walk(sprite_dir) for f in files]
+
+        for cold in [True, False]:
+            loose = measure(sprite_dir, os.path.join(tmp, "missing.bundle"), loose_files, cold, args.runs, args.count)
+            bundle = measure(sprite_dir, bundle_path, [bundle_path], cold, args.runs, args.count)
+            label = "cold" if cold else "warm"
+            print(f"{label}: loose files {loose * 1000:7.2f} ms   bundle {bundle * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
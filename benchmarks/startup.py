@@ -0,0 +1,62 @@
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from pokelookup_testing import generation_for, write_pokedex
+from pokelookup_core import PokeLookup
+
+
+# run in a fresh interpreter for every sample so startup time and peak RSS aren't polluted by earlier runs
+MEASURE_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+from pokelookup_core import PokeLookup
+PokeLookup(json_path={json_path!r}, store_path={store_path!r}, generation={generation})
+elapsed = time.perf_counter() - start
+# VmHWM rather than ru_maxrss, ru_maxrss carries over the parent's peak across fork/exec
+with open("/proc/self/status") as f:
+    max_rss_kb = int(next(line for line in f if line.startswith("VmHWM:")).split()[1])
+print(json.dumps({{"seconds": elapsed, "max_rss_kb": max_rss_kb}}))
+"""
+
+
+def measure(json_path: str, store_path: str, generation: int, runs: int) -> dict:
+    """
+    Measures the median startup time and peak RSS of constructing PokeLookup over several fresh processes
+    """
+    root = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+    script = MEASURE_SCRIPT.format(root=root, json_path=json_path, store_path=store_path, generation=generation)
+    samples = [json.loads(subprocess.check_output([sys.executable, "-c", script])) for _ in range(runs)]
+    seconds = sorted(s["seconds"] for s in samples)
+    return {"seconds": seconds[len(seconds) // 2], "max_rss_kb": max(s["max_rss_kb"] for s in samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare PokeLookup startup time and RSS when loading pokemon.json vs the compact store")
+    parser.add_argument("--count", type=int, default=386, help="number of synthetic pokemon to generate")
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes to sample per mode")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "pokemon.json")
+        store_path = os.path.join(tmp, "pokemon.bin")
+        write_pokedex(json_path, args.count)
+        generation = generation_for(args.count)
+        PokeLookup(json_path=json_path, store_path=store_path, load=False)._build_compact_store(json_path, store_path)
+
+        print(f"pokemon.json: {os.path.getsize(json_path) / 1024:.0f} KiB, pokemon.bin: {os.path.getsize(store_path) / 1024:.1f} KiB")
+        results = {
+            "json": measure(json_path, os.path.join(tmp, "missing.bin"), generation, args.runs),
+            "store": measure(json_path, store_path, generation, args.runs),
+        }
+        for mode, r in results.items():
+            print(f"{mode:>6}: {r['seconds'] * 1000:8.1f} ms  {r['max_rss_kb'] / 1024:7.1f} MiB peak RSS")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,40 @@
-import os
 import math
+import logging
 import customtkinter
-from PIL import Image
-from pokelookup_core import Pokemon, PokeLookup
-from typing import List
+from concurrent.futures import Future, ThreadPoolExecutor
+from pokelookup_core import PokeType, Pokemon, PokeLookup, SUGGESTION_LIMIT, get_generation
+from pokelookup_images import ImageCache, UNKNOWN_SPRITE_ID
+from typing import Callable, List, Sequence
+
+
+logger = logging.getLogger(__name__)
 
 
 APP_WIDTH = 1000
 APP_HEIGHT = 600
 
-BASE_IMAGE_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), "sprites")
-TYPE_IMAGE_PATH = os.path.join(BASE_IMAGE_PATH, "types")
-TYPE_SPRITE_SIZE = (144, 32)
-POKEMON_IMAGE_PATH = os.path.join(BASE_IMAGE_PATH, "pokemon")
-POKEMON_SPRITE_SIZE = (192, 192)
 FONT_FAMILY = "Roboto"
 FONT_SIZE = 24
+SEARCH_POLL_MS = 10 # how often the main loop checks whether a search has finished
+SUGGEST_DEBOUNCE_MS = 120 # suggestions update once typing pauses for this long
+
+
+class SearchResult:
+    def __init__(self, pokemon: Pokemon, type1_image: customtkinter.CTkImage, type2_image: customtkinter.CTkImage,
+                 sprite_image: customtkinter.CTkImage, type_chart: Sequence[float]):
+        """
+        Everything a finished search needs to update the window, prepared off the main loop
+        pokemon and type_chart are None when the search didn't find anything
+        """
+        self.pokemon = pokemon
+        self.type1_image = type1_image
+        self.type2_image = type2_image
+        self.sprite_image = sprite_image
+        self.type_chart = type_chart
 
 
 class PokemonDetailsFrame(customtkinter.CTkFrame):
-    def __init__(self, master):
+    def __init__(self, master, image_cache: ImageCache):
         super().__init__(master)
 
         # pokemon name label
@@ -27,24 +42,18 @@ class PokemonDetailsFrame(customtkinter.CTkFrame):
         self.name_label.grid(row=0, column=0, columnspan=2, padx=5, pady=5)
 
         # type 1
-        self.type1_image = customtkinter.CTkImage(light_image=Image.open(os.path.join(TYPE_IMAGE_PATH, "unknown.png")),
-                                                  dark_image=Image.open(os.path.join(TYPE_IMAGE_PATH, "unknown.png")),
-                                                  size=(144, 32))
+        self.type1_image = image_cache.get_unknown_type_image()
         self.type1_image_label = customtkinter.CTkLabel(self, image = self.type1_image, text="")
         self.type1_image_label.grid(row=1, column=0, padx=5, pady=(0,5))
 
         # type 2
-        self.type2_image = customtkinter.CTkImage(light_image=Image.open(os.path.join(TYPE_IMAGE_PATH, "unknown.png")),
-                                                  dark_image=Image.open(os.path.join(TYPE_IMAGE_PATH, "unknown.png")),
-                                                  size=(144, 32))
+        self.type2_image = image_cache.get_unknown_type_image()
         self.type2_image_label = customtkinter.CTkLabel(self, image = self.type2_image, text="")
         self.type2_image_label.grid(row=1, column=1, padx=5, pady=(0,5))
         # self.type2_image_label.grid_remove()
 
         # pokemon sprite
-        self.sprite_image = customtkinter.CTkImage(light_image=Image.open(os.path.join(POKEMON_IMAGE_PATH, "0.png")),
-                                                   dark_image=Image.open(os.path.join(POKEMON_IMAGE_PATH, "0.png")),
-                                                   size=(192, 192))
+        self.sprite_image = image_cache.get_sprite(UNKNOWN_SPRITE_ID)
         self.sprite_image_label = customtkinter.CTkLabel(self, image=self.sprite_image, text="")
         self.sprite_image_label.grid(row=2, column=0, columnspan=2, padx=5)
     
@@ -63,9 +72,11 @@ class PokemonDetailsFrame(customtkinter.CTkFrame):
 
 
 class TypeChartFrame(customtkinter.CTkFrame):
-    def __init__(self, master):
+    def __init__(self, master, image_cache: ImageCache, types: Sequence[PokeType]):
         super().__init__(master)
 
+        self.types = types # the attack types to show, in order
+
         self.grid_columnconfigure([0,1,2,3], weight=1)
 
         self.type_chart_label = customtkinter.CTkLabel(self, text="Type Effectiveness")
@@ -74,7 +85,7 @@ class TypeChartFrame(customtkinter.CTkFrame):
         self.type_eff_images = []
         self.type_eff_labels = []
 
-        num_images = 17
+        num_images = len(types)
         half_images = math.floor(num_images / 2)
         row = 0
         col = 0
@@ -84,8 +95,7 @@ class TypeChartFrame(customtkinter.CTkFrame):
             row = i + 1 if i <= half_images else i - half_images
             col = 0 if i <= half_images else 2
 
-            image = Image.open(os.path.join(TYPE_IMAGE_PATH, f"{i}.png"))
-            image_ctk = customtkinter.CTkImage(dark_image=image, light_image=image, size=TYPE_SPRITE_SIZE)
+            image_ctk = image_cache.get_type_image(types[i])
             image_lbl = customtkinter.CTkLabel(master=self, image=image_ctk, text="")
             image_lbl.grid(row=row, column=col, pady=5, sticky="nesw")
             self.type_eff_images.append(image_lbl)
@@ -129,11 +139,12 @@ class TypeChartFrame(customtkinter.CTkFrame):
             val = "1/4"
         return val
 
-    def set_type_chart(self, type_chart: List[float]):
-        for i in range(0, len(type_chart)):
-            self.type_eff_labels[i].configure(text = self.convert_multiplier_to_text(type_chart[i]))
-            self.type_eff_labels[i].configure(fg_color = self.get_multiplier_fg_color(type_chart[i]))
-            self.type_eff_labels[i].configure(text_color = self.get_multiplier_text_color(type_chart[i]))
+    def set_type_chart(self, type_chart: Sequence[float]):
+        # type_chart covers every PokeType, only the ones this frame shows are used
+        for i, t in enumerate(self.types):
+            self.type_eff_labels[i].configure(text = self.convert_multiplier_to_text(type_chart[t.value]))
+            self.type_eff_labels[i].configure(fg_color = self.get_multiplier_fg_color(type_chart[t.value]))
+            self.type_eff_labels[i].configure(text_color = self.get_multiplier_text_color(type_chart[t.value]))
 
     def reset_type_chart(self):
         for lbl in self.type_eff_labels:
@@ -148,6 +159,49 @@ class TypeChartFrame(customtkinter.CTkFrame):
 
 
 
+class SuggestionFrame(customtkinter.CTkFrame):
+    def __init__(self, master, command: Callable[[Pokemon], None]):
+        """
+        Dropdown of search suggestions shown under the search bar
+
+        Parameters:
+            command (Callable[[Pokemon], None]): called with the suggested pokemon when a suggestion is clicked
+        """
+        super().__init__(master)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.command = command
+        self.suggestions = []
+
+        # the buttons are made once and reused, each update only changes their text and hides the ones not needed
+        self.suggestion_buttons = []
+        for i in range(0, SUGGESTION_LIMIT):
+            button = customtkinter.CTkButton(self, text="", anchor="w", fg_color="transparent", command=lambda i=i: self.command(self.suggestions[i]))
+            self.suggestion_buttons.append(button)
+
+    def set_suggestions(self, anchor: customtkinter.CTkBaseClass, suggestions: List[Pokemon]):
+        """
+        Shows suggestions directly below anchor, or hides the dropdown if there aren't any
+        """
+        self.suggestions = suggestions[:SUGGESTION_LIMIT]
+        if not self.suggestions:
+            self.hide()
+            return
+
+        for i, button in enumerate(self.suggestion_buttons):
+            if i < len(self.suggestions):
+                button.configure(text=f"#{self.suggestions[i].id:03} - {self.suggestions[i].name.title()}")
+                button.grid(row=i, column=0, sticky="ew")
+            else:
+                button.grid_remove()
+
+        self.place(in_=anchor, relx=0, rely=1, relwidth=1)
+        self.lift()
+
+    def hide(self):
+        self.place_forget()
+
+
 class App(customtkinter.CTk):
     def __init__(self):
         super().__init__()
@@ -164,87 +218,172 @@ class App(customtkinter.CTk):
         self.grid_rowconfigure(0, weight=0)
         self.grid_rowconfigure(1, weight=1)
 
-        self.pokemon_details_frame = PokemonDetailsFrame(self)
+        self.image_cache = ImageCache()
+        self.pokelookup = PokeLookup(fast_start=True)
+
+        self.pokemon_details_frame = PokemonDetailsFrame(self, self.image_cache)
         self.pokemon_details_frame.set_font(self.APP_FONT)
         self.pokemon_details_frame.grid(row=0, column=0, rowspan=2, sticky="nsew")
 
         self.search_bar = customtkinter.CTkEntry(self, placeholder_text="Pokemon Lookup", bg_color="transparent")
         self.search_bar.bind("<Return>", self.search_button_event)
+        self.search_bar.bind("<KeyRelease>", self.search_bar_key_event)
         self.search_bar.grid(row=0, column=1, sticky="nesw", padx=5, pady=(5, 25))
 
         self.search_button = customtkinter.CTkButton(self, text="Search", command = self.search_button_event)
         self.search_button.grid(row=0, column=2, padx=5, pady=(5,25))
 
-        self.type_chart_frame = TypeChartFrame(self)
+        self.type_chart_frame = TypeChartFrame(self, self.image_cache, get_generation(self.pokelookup.generation).types)
         self.type_chart_frame.configure(fg_color="transparent")
         self.type_chart_frame.grid(row=1, column=1, columnspan=2, sticky="nesw")
         self.type_chart_frame.set_font(self.APP_FONT)
 
-        self.pokelookup = PokeLookup()
+        self.suggestion_frame = SuggestionFrame(self, self.suggestion_event)
+        self._suggest_after_id = None
+
+        # searches run on a single worker thread so the window stays responsive, see search_button_event
+        self._search_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search")
+        self._search_future = None
+        self._search_generation = 0
 
 
     def search_button_event(self, event = None):
+        """
+        Starts a search for whatever is in the search bar on the search worker thread
+        Any search still in flight is abandoned, only the newest search ever updates the window
+        """
         search_text = self.search_bar.get()
-        print(f"Searching for: {search_text}")
+        logger.info("Searching for: %s", search_text)
+        self._cancel_suggestions()
+
+        self._search_generation += 1
+        if self._search_future is not None:
+            # this only stops searches that haven't started yet, one that's already running is ignored when it finishes
+            self._search_future.cancel()
+        self._search_future = self._search_executor.submit(self._prepare_search, search_text, self._search_generation)
+        self.after(SEARCH_POLL_MS, self._poll_search, self._search_future, self._search_generation, search_text)
+
+
+    def search_bar_key_event(self, event):
+        """
+        Debounces suggestion updates so they only run once typing pauses instead of on every single keystroke
+        """
+        if event.keysym in ("Return", "KP_Enter", "Escape"):
+            self._cancel_suggestions()
+            return
+
+        if self._suggest_after_id is not None:
+            self.after_cancel(self._suggest_after_id)
+        self._suggest_after_id = self.after(SUGGEST_DEBOUNCE_MS, self._update_suggestions)
+
+
+    def _update_suggestions(self):
+        self._suggest_after_id = None
+        self.suggestion_frame.set_suggestions(self.search_bar, self.pokelookup.suggest(self.search_bar.get()))
+
+
+    def _cancel_suggestions(self):
+        if self._suggest_after_id is not None:
+            self.after_cancel(self._suggest_after_id)
+            self._suggest_after_id = None
+        self.suggestion_frame.hide()
+
+
+    def suggestion_event(self, pokemon: Pokemon):
+        """
+        Searches for a suggestion that was clicked
+        """
+        self.search_bar.delete(0, "end")
+        self.search_bar.insert(0, pokemon.name)
+        self.search_button_event()
+
+
+    def _prepare_search(self, search_text: str, generation: int) -> "SearchResult":
+        """
+        Runs on the search worker thread. Does the lookup and gets the images and type chart ready without touching any widgets
+
+        Returns:
+            SearchResult: everything needed to update the window, or None if a newer search came in while this one ran
+        """
         pokemon = self.pokelookup.find_pokemon(search_text)
+        if generation != self._search_generation:
+            return None
+
+        if pokemon is None:
+            unknown_type = self.image_cache.get_unknown_type_image()
+            return SearchResult(None, unknown_type, unknown_type, self.image_cache.get_sprite(UNKNOWN_SPRITE_ID), None)
+
+        return SearchResult(pokemon,
+                            self.image_cache.get_type_image(pokemon.type1),
+                            self.image_cache.get_type_image(pokemon.type2),
+                            self.image_cache.get_sprite(pokemon.id),
+                            pokemon.get_type_chart())
+
+
+    def _poll_search(self, future: Future, generation: int, search_text: str):
+        """
+        Runs on the Tk main loop. Waits for a search to finish without blocking and then shows its result
+        """
+        if generation != self._search_generation:
+            return # a newer search has replaced this one
+        if not future.done():
+            self.after(SEARCH_POLL_MS, self._poll_search, future, generation, search_text)
+            return
+
+        result = future.result()
+        if result is not None:
+            self._show_search_result(result, search_text)
+
+
+    def _show_search_result(self, result: "SearchResult", search_text: str):
+        pokemon = result.pokemon
 
         if pokemon is not None:
             # pokemon was found, set all our fields
-            print(pokemon)
+            logger.info("Found %s", pokemon.name)
 
             # name
             name_str = f"#{pokemon.id:03} - {pokemon.name.title()}"
             self.pokemon_details_frame.set_name(name_str)
-            
-            # types
-            type1_image = Image.open(os.path.join(TYPE_IMAGE_PATH, f"{pokemon.type1.value}.png"))
-            type1_ctk = customtkinter.CTkImage(dark_image=type1_image, light_image=type1_image, size=TYPE_SPRITE_SIZE)
 
-            type2_file_name = "none" if pokemon.type2 is None else pokemon.type2.value
-            type2_image = Image.open(os.path.join(TYPE_IMAGE_PATH, f"{type2_file_name}.png"))
-            type2_ctk = customtkinter.CTkImage(dark_image=type2_image, light_image=type2_image, size=TYPE_SPRITE_SIZE)
-
-            self.pokemon_details_frame.set_types(type1_ctk, type2_ctk)
+            # types
+            self.pokemon_details_frame.set_types(result.type1_image, result.type2_image)
 
             # pokemon sprite
-            sprite_image = Image.open(os.path.join(POKEMON_IMAGE_PATH, f"{pokemon.id}.png"))
-            sprite_ctk = customtkinter.CTkImage(dark_image=sprite_image, light_image=sprite_image, size=POKEMON_SPRITE_SIZE)
-            self.pokemon_details_frame.set_pokemon_sprite(sprite_ctk)
+            self.pokemon_details_frame.set_pokemon_sprite(result.sprite_image)
 
             # type chart
-            self.type_chart_frame.set_type_chart(pokemon.get_type_chart())
+            self.type_chart_frame.set_type_chart(result.type_chart)
         else:
             # pokemon not found, set fields to unknown
-            print(f"Unable to find {search_text}")
+            logger.info("Unable to find %s", search_text)
 
             # name
             self.pokemon_details_frame.set_name("???")
-            
-            # types
-            type1_image = Image.open(os.path.join(TYPE_IMAGE_PATH, "unknown.png"))
-            type1_ctk = customtkinter.CTkImage(dark_image=type1_image, light_image=type1_image, size=TYPE_SPRITE_SIZE)
 
-            type2_image = Image.open(os.path.join(TYPE_IMAGE_PATH, "unknown.png"))
-            type2_ctk = customtkinter.CTkImage(dark_image=type2_image, light_image=type2_image, size=TYPE_SPRITE_SIZE)
-
-            self.pokemon_details_frame.set_types(type1_ctk, type2_ctk)
+            # types
+            self.pokemon_details_frame.set_types(result.type1_image, result.type2_image)
 
             # pokemon sprite
-            sprite_image = Image.open(os.path.join(POKEMON_IMAGE_PATH, "0.png"))
-            sprite_ctk = customtkinter.CTkImage(dark_image=sprite_image, light_image=sprite_image, size=POKEMON_SPRITE_SIZE)
-            self.pokemon_details_frame.set_pokemon_sprite(sprite_ctk)
+            self.pokemon_details_frame.set_pokemon_sprite(result.sprite_image)
 
             self.type_chart_frame.reset_type_chart()
-        
+
         self.search_bar.focus_set()
         self.search_bar.select_to(len(search_text))
 
 
+    def destroy(self):
+        self._search_executor.shutdown(wait=False, cancel_futures=True)
+        super().destroy()
+
+
 ################################################################################
 #  Function:  main                                                             #
 #  Purpose:   do all the stuff                                                 #
 ################################################################################
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     app = App()
     app.mainloop()
 
@@ -0,0 +1,187 @@
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import fileinput
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List
+from pokelookup_core import DEFAULT_GENERATION, GENERATION_DEX_SIZES, POKEDEX_JSON_PATH, POKEDEX_STORE_PATH, PokeLookup, get_generation
+
+
+CHUNK_SIZE = 1000 # names resolved per match_many call (and per task when using a process pool)
+PROGRESS_INTERVAL = 2 # seconds between progress lines on stderr
+CSV_FIELDS = ["query", "id", "name", "type1", "type2"] # followed by a column per attack type in the generation
+
+# set in each pool worker by _init_worker
+_worker_pokelookup = None
+
+
+def read_names(paths: List[str]) -> Iterator[str]:
+    """
+    Streams names one line at a time from each file in paths, "-" or no paths at all reads stdin
+    Blank lines are skipped
+    """
+    with fileinput.input(paths or ["-"], encoding="utf-8") as f:
+        for line in f:
+            name = line.strip()
+            if name:
+                yield name
+
+
+def chunked(items: Iterable, size: int) -> Iterator[list]:
+    """
+    Groups items into lists of up to size items without reading further ahead than that
+    """
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def resolve_chunk(pokelookup: PokeLookup, names: List[str]) -> List[dict]:
+    """
+    Resolves a chunk of names and returns one output row per name, id/name/types are None for names that didn't match
+    """
+    rows = []
+    for query, pokemon in zip(names, pokelookup.match_many(names, workers=1)):
+        row = {"query": query, "id": None, "name": None, "types": None, "type_chart": None}
+        if pokemon is not None:
+            row.update(pokemon.to_dict(include_type_chart=True))
+        rows.append(row)
+    return rows
+
+
+def _init_worker(json_path: str, store_path: str, generation: int):
+    global _worker_pokelookup
+    _worker_pokelookup = PokeLookup(json_path=json_path, store_path=store_path, cache_size=0, generation=generation)
+
+
+def _resolve_chunk_worker(names: List[str]) -> List[dict]:
+    return resolve_chunk(_worker_pokelookup, names)
+
+
+def resolve_chunks(chunks: Iterable[List[str]], json_path: str, store_path: str, processes: int,
+                   generation: int = DEFAULT_GENERATION) -> Iterator[List[dict]]:
+    """
+    Resolves chunks of names in order, either in this process or spread over a process pool
+    The pool is only ever given a couple of chunks per process ahead of what has been written out, so memory use stays
+    flat no matter how much input there is
+
+    Parameters:
+        chunks     (Iterable[List[str]]): chunks of names, e.g., from chunked(read_names(...))
+        processes  (int):                worker processes, 1 resolves everything in this process
+        generation (int):                generation to resolve names in
+    """
+    if processes <= 1:
+        pokelookup = PokeLookup(json_path=json_path, store_path=store_path, cache_size=0, generation=generation)
+        for chunk in chunks:
+            yield resolve_chunk(pokelookup, chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(json_path, store_path, generation)) as executor:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append(executor.submit(_resolve_chunk_worker, chunk))
+            if len(in_flight) >= processes * 2:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+class NDJSONWriter:
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, row: dict):
+        self.f.write(json.dumps(row) + "\n")
+
+
+class CSVWriter:
+    def __init__(self, f, type_names: List[str]):
+        self.writer = csv.writer(f)
+        self.type_names = type_names
+        self.writer.writerow(CSV_FIELDS + type_names)
+
+    def write(self, row: dict):
+        types = row["types"] or []
+        type_chart = row["type_chart"] or {}
+        self.writer.writerow([row["query"], row["id"], row["name"],
+                              types[0] if len(types) > 0 else None,
+                              types[1] if len(types) > 1 else None] +
+                             [type_chart.get(t) for t in self.type_names])
+
+
+class Progress:
+    def __init__(self, enabled: bool):
+        """
+        Reports names processed and throughput to stderr every PROGRESS_INTERVAL seconds
+        """
+        self.enabled = enabled
+        self.count = 0
+        self.unresolved = 0
+        self.start = time.perf_counter()
+        self.last_report = self.start
+
+    def update(self, rows: List[dict]):
+        self.count += len(rows)
+        self.unresolved += sum(1 for r in rows if r["id"] is None)
+        now = time.perf_counter()
+        if self.enabled and now - self.last_report >= PROGRESS_INTERVAL:
+            self.last_report = now
+            print(f"{self.count:,} names, {self.count / (now - self.start):,.0f} names/s", file=sys.stderr, flush=True)
+
+    def finish(self):
+        if self.enabled:
+            elapsed = time.perf_counter() - self.start
+            rate = self.count / elapsed if elapsed > 0 else 0
+            print(f"Done: {self.count:,} names ({self.unresolved:,} unresolved) in {elapsed:.2f}s, {rate:,.0f} names/s", file=sys.stderr, flush=True)
+
+
+################################################################################
+#  Function:  main                                                             #
+#  Purpose:   resolve a stream of names                                        #
+################################################################################
+def main():
+    parser = argparse.ArgumentParser(description="Resolve pokemon names in bulk, one name per line, and write their types and type charts")
+    parser.add_argument("inputs", nargs="*", help="files to read names from, - or nothing reads stdin")
+    parser.add_argument("-o", "--output", help="file to write to, defaults to stdout")
+    parser.add_argument("-f", "--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("-p", "--processes", type=int, default=1, help="worker processes to resolve names with")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="names per batch")
+    parser.add_argument("--json-path", default=POKEDEX_JSON_PATH)
+    parser.add_argument("--store-path", default=POKEDEX_STORE_PATH)
+    parser.add_argument("-g", "--generation", type=int, default=DEFAULT_GENERATION, choices=sorted(GENERATION_DEX_SIZES))
+    parser.add_argument("-q", "--quiet", action="store_true", help="don't report progress on stderr")
+    args = parser.parse_args()
+
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        writer = CSVWriter(out, get_generation(args.generation).type_names) if args.format == "csv" else NDJSONWriter(out)
+        progress = Progress(not args.quiet)
+        chunks = chunked(read_names(args.inputs), args.chunk_size)
+        for rows in resolve_chunks(chunks, args.json_path, args.store_path, args.processes, args.generation):
+            for row in rows:
+                writer.write(row)
+            progress.update(rows)
+        progress.finish()
+    except BrokenPipeError:
+        # whatever we were piped into (e.g., head) stopped reading, point stdout at devnull so the exit flush doesn't fail again
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+################################################################################
+#  Script entry point                                                          #
+################################################################################
+if __name__ == "__main__":
+    main()
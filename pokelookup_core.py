@@ -1,14 +1,79 @@
-import requests
+import os
+import sys
+import time
+import atexit
+import argparse
+import struct
+import bisect
+import threading
+import logging
+import functools
+import hashlib
 import json
-from tqdm import tqdm
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
 from enum import Enum
 from timeit import default_timer as timer
-from typing import List
-from rapidfuzz import fuzz, utils
+from typing import TYPE_CHECKING, Any, Callable, ContextManager, Dict, Hashable, List, Sequence, Tuple
+
+# numpy, rapidfuzz, requests and tqdm are imported where they're first needed rather than here, so importing this module
+# and doing exact lookups stays cheap. requests and tqdm are only ever used by --download
+if TYPE_CHECKING:
+    import numpy as np
+    import requests
+
+
+logger = logging.getLogger(__name__)
 
 
 BASE_URL = "https://pokeapi.co/api/v2"
-POKEDEX_RANGE = range(1, 386+1) # gen 3 is 1-386 inclusive
+POKEDEX_JSON_PATH = "pokemon.json"
+POKEDEX_STORE_PATH = "pokemon.bin" # compact store projected from pokemon.json, see PokeLookup._build_compact_store
+
+# compact store layout (little endian):
+#   header:  magic, version, record count, generation count
+#   records: id, name length. One per pokemon in download order
+#   types:   type1, type2 (NO_TYPE if single typed) for every generation from 1 to generation count, one run per record
+#   names:   every pokemon name, utf-8 encoded and concatenated in record order
+STORE_MAGIC = b"PLDX"
+STORE_VERSION = 2
+STORE_HEADER = struct.Struct("<4sHIB")
+STORE_RECORD = struct.Struct("<HB")
+NO_TYPE = 0xFF
+
+# spellings people commonly type that don't normalize to the pokeapi name on their own, keyed by their normalized form
+# (normalize_name already takes care of case, spaces, periods, apostrophes and the gender symbols)
+POKEMON_ALIASES = {
+    "nidoran-female": "nidoran-f",
+    "nidoran-male":   "nidoran-m",
+    "mister-mime":    "mr-mime",
+    "farfetched":     "farfetchd",
+    "deoxys":         "deoxys-normal",
+}
+
+# downloader settings
+DOWNLOAD_CACHE_DIR = "pokemon_cache" # one json file per pokemon, lets an interrupted download resume
+DOWNLOAD_MANIFEST = "manifest.json" # in DOWNLOAD_CACHE_DIR, each record's ETag, Last-Modified and content hash for refreshes
+DOWNLOAD_WORKERS = 8
+DOWNLOAD_RETRIES = 3
+DOWNLOAD_BACKOFF = 0.5 # seconds, doubled after every failed attempt
+DOWNLOAD_TIMEOUT = 10 # seconds
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# fuzzy matching settings
+FUZZY_CANDIDATES = 5 # default number of results from find_candidates
+MATCH_MANY_CHUNK = 1024 # queries scored per cdist call in match_many, bounds the score matrix to chunk x pokedex size
+
+FIND_CACHE_SIZE = 256 # number of find_pokemon results kept in the LRU cache, 0 disables it
+
+# search as you type settings
+SUGGESTION_LIMIT = 8
+SUGGESTION_SCORE_CUTOFF = 50 # fuzzy fallback suggestions scoring below this (0-100) aren't worth showing
+
+# instrumentation settings
+INSTRUMENTATION_ENV = "POKELOOKUP_INSTRUMENT" # set to 1 to turn instrumentation on at import
+# upper bounds in seconds of the stage latency histogram buckets, anything slower lands in the +Inf bucket
+LATENCY_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5)
 
 
 class PokeType(Enum):
@@ -29,9 +94,12 @@ class PokeType(Enum):
     ICE      = 14
     DRAGON   = 15
     DARK     = 16
+    FAIRY    = 17 # generation 6 onwards
 
 
-TYPE_CHART = [
+# the generation 2-5 chart, generation 1 and 6+ charts are built from it with GENERATION_1_CHANGES and GENERATION_6_CHANGES
+# kept as plain lists so nothing at import needs numpy, the read only numpy TYPE_CHART is made from it on first use, see __getattr__
+BASE_TYPE_CHART = [
     # Attack type in rows, Defender type in columns
     #                                                           Defending Type
     # Normal    Fighting    Flying  Poison  Ground  Rock    Bug     Ghost   Steel   Fire    Water   Grass   Electric    Psychic Ice     Dragon  Dark
@@ -71,14 +139,372 @@ TYPE_CHART = [
     [ 1,        0.5,        1,      1,      1,      1,      1,      2,      0.5,    1,      1,      1,      1,          2,      1,      1,      0.5 ]
 ]
 
+NUM_TYPES = len(PokeType)
+TYPE_NAMES = [t.name.lower() for t in PokeType] # lower case type names in PokeType order, as used by pokeapi
+NO_TYPE_INDEX = NUM_TYPES # stands in for type2 of single typed pokemon when indexing Generation.defensive_profiles
+
+# highest national dex number in each generation, a generation's pokedex is every pokemon from 1 up to it
+GENERATION_DEX_SIZES = {1: 151, 2: 251, 3: 386, 4: 493, 5: 649, 6: 721, 7: 809, 8: 905, 9: 1025}
+DEFAULT_GENERATION = 3
+LATEST_GENERATION = max(GENERATION_DEX_SIZES)
+# pokeapi generation names as used by past_types, e.g. "generation-v" -> 5
+GENERATION_NAMES = {f"generation-{numeral}": i + 1 for i, numeral in enumerate(["i", "ii", "iii", "iv", "v", "vi", "vii", "viii", "ix"])}
+
+# (attack type, defending type): multiplier, everywhere generation 1 differs from TYPE_CHART
+GENERATION_1_CHANGES = {
+    (PokeType.GHOST,  PokeType.PSYCHIC): 0, # a bug in the original games, ghost was meant to be super effective
+    (PokeType.BUG,    PokeType.POISON):  2,
+    (PokeType.POISON, PokeType.BUG):     2,
+    (PokeType.ICE,    PokeType.FIRE):    1,
+}
+# and everywhere generation 6 onwards differs. Fairy was added and steel stopped resisting ghost and dark
+GENERATION_6_CHANGES = {
+    (PokeType.GHOST,    PokeType.STEEL):    1,
+    (PokeType.DARK,     PokeType.STEEL):    1,
+    (PokeType.FAIRY,    PokeType.FIGHTING): 2,
+    (PokeType.FAIRY,    PokeType.DRAGON):   2,
+    (PokeType.FAIRY,    PokeType.DARK):     2,
+    (PokeType.FAIRY,    PokeType.FIRE):     0.5,
+    (PokeType.FAIRY,    PokeType.POISON):   0.5,
+    (PokeType.FAIRY,    PokeType.STEEL):    0.5,
+    (PokeType.FIGHTING, PokeType.FAIRY):    0.5,
+    (PokeType.BUG,      PokeType.FAIRY):    0.5,
+    (PokeType.DARK,     PokeType.FAIRY):    0.5,
+    (PokeType.POISON,   PokeType.FAIRY):    2,
+    (PokeType.STEEL,    PokeType.FAIRY):    2,
+    (PokeType.DRAGON,   PokeType.FAIRY):    0,
+}
+
+
+def _build_type_chart(generation: int, types: Tuple[PokeType, ...]) -> List[List[float]]:
+    """
+    Builds a generation's full NUM_TYPES x NUM_TYPES chart, attack type in rows and defender type in columns
+    Types the generation doesn't have are neutral (1) both ways so they never count as a weakness or a resistance
+    """
+    chart = [[1.0] * NUM_TYPES for _ in range(NUM_TYPES)]
+    for attack, row in enumerate(BASE_TYPE_CHART):
+        chart[attack][:len(row)] = [float(m) for m in row]
+    changes = GENERATION_1_CHANGES if generation == 1 else GENERATION_6_CHANGES if generation >= 6 else {}
+    for (attack, defender), multiplier in changes.items():
+        chart[attack.value][defender.value] = float(multiplier)
+
+    missing = [t.value for t in PokeType if t not in types]
+    for attack in range(NUM_TYPES):
+        for defender in range(NUM_TYPES):
+            if attack in missing or defender in missing:
+                chart[attack][defender] = 1.0
+    return chart
+
+
+def _build_defensive_profiles(type_chart: "np.ndarray") -> "np.ndarray":
+    """
+    Precomputes every attack type's multiplier against every single and dual typing
+
+    Returns:
+        np.ndarray: (type1, type2, attack type) shaped matrix, use NO_TYPE_INDEX as type2 for single typed pokemon
+    """
+    import numpy as np
+    # defending type x attack type, plus a row of 1s for the missing second type
+    defense = np.vstack([type_chart.T, np.ones(NUM_TYPES)])
+    profiles = defense[:NUM_TYPES, None, :] * defense[None, :, :]
+    profiles.flags.writeable = False
+    return profiles
+
+
+def _to_multiplier(value: float) -> float:
+    """
+    Converts whole multipliers to int (e.g., 1.0 -> 1) so they print the same way they're written in TYPE_CHART
+    """
+    return round(value) if value == round(value) else value
+
+
+class Generation:
+    def __init__(self, number: int):
+        """
+        One generation's dex size, types and type charts. Use get_generation instead of building these
+        The plain python tables Pokemon needs are worked out up front, the numpy ones the first time they're used
+
+        Parameters:
+            number (int): generation number, a key of GENERATION_DEX_SIZES
+
+        Raises:
+            ValueError: if there's no such generation
+        """
+        if number not in GENERATION_DEX_SIZES:
+            raise ValueError(f"unknown generation {number}, expected 1 to {LATEST_GENERATION}")
+        self.number = number
+        self.dex_size = GENERATION_DEX_SIZES[number]
+
+        missing = set()
+        if number < 2:
+            missing |= {PokeType.DARK, PokeType.STEEL}
+        if number < 6:
+            missing.add(PokeType.FAIRY)
+        self.types = tuple(t for t in PokeType if t not in missing) # the types that exist in this generation
+        self.type_names = [TYPE_NAMES[t.value] for t in self.types]
+        # how many entries Pokemon.get_type_chart has. Fairy is the only type added after gen 2, so generations before it
+        # keep the 17 entry charts get_type_chart always returned, the numpy tables are NUM_TYPES wide for every generation
+        self.chart_size = NUM_TYPES if PokeType.FAIRY in self.types else PokeType.FAIRY.value
+
+        self.type_chart_list = _build_type_chart(number, self.types)
+        # defensive_profiles as python lists, so Pokemon can pick up its type chart without touching numpy
+        # defense[d][a] is attack type a against defending type d, the extra row of 1s is the missing second type
+        defense = [[row[d] for row in self.type_chart_list] for d in range(NUM_TYPES)] + [[1.0] * NUM_TYPES]
+        self.type_chart_rows = [[tuple(_to_multiplier(m1 * m2) for m1, m2 in zip(type1_row[:self.chart_size], type2_row))
+                                 for type2_row in defense] for type1_row in defense[:NUM_TYPES]]
+
+    @functools.cached_property
+    def type_chart(self) -> "np.ndarray":
+        """
+        Read only numpy copy of the generation's chart, attack type in rows and defender type in columns
+        """
+        import numpy as np
+        chart = np.array(self.type_chart_list, dtype=np.float64)
+        chart.flags.writeable = False
+        return chart
+
+    @functools.cached_property
+    def defensive_profiles(self) -> "np.ndarray":
+        """
+        See _build_defensive_profiles
+        """
+        return _build_defensive_profiles(self.type_chart)
+
+
+@functools.lru_cache(maxsize=None)
+def get_generation(number: int) -> Generation:
+    """
+    Returns the shared Generation for number, building it the first time it's asked for
+    """
+    return Generation(number)
+
+
+def __getattr__(name: str):
+    # module level TYPE_CHART is built the first time someone asks for it, so importing this module doesn't import numpy
+    if name == "TYPE_CHART":
+        import numpy as np
+        chart = np.array(BASE_TYPE_CHART, dtype=np.float64)
+        chart.flags.writeable = False
+        globals()["TYPE_CHART"] = chart
+        return chart
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalizes a user typed pokemon name to the pokeapi naming style
+    e.g., "Mr. Mime" -> "mr-mime", "Farfetch'd" -> "farfetchd", "Nidoran♀" -> "nidoran-f"
+
+    Parameters:
+        name (str): name as typed by the user
+
+    Returns:
+        str: lower case, hyphen separated name
+    """
+    name = name.strip().lower().replace("♀", "-f").replace("♂", "-m")
+    for c in ".'’":
+        name = name.replace(c, "")
+    return "-".join(name.replace("_", " ").replace("-", " ").split())
+
+
+def _record_hash(record: dict) -> str:
+    """
+    sha256 of a pokemon record's content, the same however the server happened to order or space its json
+    """
+    return hashlib.sha256(json.dumps(record, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        """
+        Counts observed values into fixed buckets, like a prometheus histogram
+
+        Parameters:
+            buckets (Tuple[float, ...]): sorted bucket upper bounds, a +Inf bucket is always added on the end
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            dict: count, sum and the cumulative count at or below each bucket bound, keyed by the bound as a string
+        """
+        bounds = [repr(b) for b in self.buckets] + ["+Inf"]
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(bounds, self.counts):
+            cumulative += count
+            buckets[bound] = cumulative
+        return {"count": self.count, "sum": self.sum, "buckets": buckets}
+
+
+class Instrumentation:
+    _DISABLED_STAGE = nullcontext()
+
+    def __init__(self, enabled: bool = False):
+        """
+        Opt in per stage timers and event counters for the lookup hot paths
+        While disabled every hook returns straight away, stage() hands back one shared do nothing context manager
+
+        Parameters:
+            enabled (bool): start recording straight away
+        """
+        self.enabled = enabled
+        self._stages: Dict[str, Histogram] = {}
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """
+        Drops everything recorded so far
+        """
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+    def observe(self, stage: str, seconds: float):
+        """
+        Records one run of stage that took seconds
+        """
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def count(self, event: str, n: int = 1):
+        """
+        Adds n to the counter for event, does nothing while disabled
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[event] = self._counters.get(event, 0) + n
+
+    def stage(self, stage: str) -> ContextManager:
+        """
+        Times the body of a with block as a run of stage, e.g. with instrumentation.stage("fuzzy"): ...
+        """
+        if not self.enabled:
+            return self._DISABLED_STAGE
+        return self._timed_stage(stage)
+
+    @contextmanager
+    def _timed_stage(self, stage: str):
+        start = timer()
+        try:
+            yield
+        finally:
+            self.observe(stage, timer() - start)
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            dict: {'stages': {stage: histogram, see Histogram.to_dict}, 'counters': {event: count}}
+        """
+        with self._lock:
+            return {
+                "stages": {stage: histogram.to_dict() for stage, histogram in sorted(self._stages.items())},
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+
+    def to_prometheus(self) -> str:
+        """
+        Returns everything recorded in the prometheus text exposition format
+        """
+        snapshot = self.to_dict()
+        lines = ["# HELP pokelookup_stage_seconds Time spent in each lookup stage",
+                 "# TYPE pokelookup_stage_seconds histogram"]
+        for stage, histogram in snapshot["stages"].items():
+            for bound, count in histogram["buckets"].items():
+                lines.append(f'pokelookup_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'pokelookup_stage_seconds_sum{{stage="{stage}"}} {histogram["sum"]!r}')
+            lines.append(f'pokelookup_stage_seconds_count{{stage="{stage}"}} {histogram["count"]}')
+        lines += ["# HELP pokelookup_events_total Lookup events by kind",
+                  "# TYPE pokelookup_events_total counter"]
+        for event, count in snapshot["counters"].items():
+            lines.append(f'pokelookup_events_total{{event="{event}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+# the process wide instrumentation every hook in PokeLookup reports to
+instrumentation = Instrumentation(enabled=os.environ.get(INSTRUMENTATION_ENV, "") not in ("", "0"))
+
+
+def timed(stage: str) -> Callable:
+    """
+    Decorator that times every call of the wrapped function as a run of stage while instrumentation is enabled
+    """
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not instrumentation.enabled:
+                return fn(*args, **kwargs)
+            start = timer()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                instrumentation.observe(stage, timer() - start)
+        return wrapper
+    return decorator
+
 
 class Pokemon:
-    def __init__(self, id: int, name: str, type1: PokeType, type2: PokeType):
-        self.id = id
-        self.name = name
-        self.type1 = type1
-        self.type2 = type2
+    """
+    An immutable pokemon, PokeLookup builds one per species at load time and every lookup hands back that same instance
+    Slots keep each one to a fixed handful of fields and the type chart is worked out once here instead of on every call
+    """
+    __slots__ = ("id", "name", "type1", "type2", "generation", "_type_chart")
+
+    def __init__(self, id: int, name: str, type1: PokeType, type2: PokeType, generation: int = DEFAULT_GENERATION):
+        object.__setattr__(self, "id", id)
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "type1", type1)
+        object.__setattr__(self, "type2", type2)
+        object.__setattr__(self, "generation", generation) # whose types and type chart these are
+        type1_index, type2_index = self._type_indexes()
+        object.__setattr__(self, "_type_chart", get_generation(generation).type_chart_rows[type1_index][type2_index])
 
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Pokemon is immutable, can't set {name}")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Pokemon is immutable, can't delete {name}")
+
+    def __eq__(self, other):
+        if not isinstance(other, Pokemon):
+            return NotImplemented
+        return (self.id, self.name, self.type1, self.type2, self.generation) == (other.id, other.name, other.type1, other.type2, other.generation)
+
+    def __hash__(self):
+        return hash((self.id, self.name, self.type1, self.type2, self.generation))
+
+    def __reduce__(self):
+        # slots + the __setattr__ guard break default pickling, rebuild through __init__ instead
+        return Pokemon, (self.id, self.name, self.type1, self.type2, self.generation)
+
+    def _type_indexes(self) -> Tuple[int, int]:
+        """
+        Returns this pokemon's types as Generation.defensive_profiles indexes
+        """
+        return self.type1.value, NO_TYPE_INDEX if self.type2 is None else self.type2.value
 
     def get_type_effectiveness(self, attack_type: PokeType) -> float:
         """
@@ -91,23 +517,43 @@ class Pokemon:
             float: The effectiveness (or damage multiplier) of specified attack type vs this Pokemon
     
         """
-        type1_effectiveness = TYPE_CHART[attack_type.value][self.type1.value]
-        type2_effectiveness = 1 if self.type2 is None else TYPE_CHART[attack_type.value][self.type2.value]
-        overall_effectiveness = type1_effectiveness * type2_effectiveness
-        return round(overall_effectiveness) if overall_effectiveness == round(overall_effectiveness) else overall_effectiveness # this seems silly but it will convert '1.0' to '1'
+        # fairy isn't in the chart before gen 6, and like every type a generation doesn't have it's neutral there
+        return self._type_chart[attack_type.value] if attack_type.value < len(self._type_chart) else 1
 
-    def get_type_chart(self) -> List[float]:
+    def get_type_chart(self) -> Tuple[float, ...]:
         """
         returns type effectiveness for each type against this pokemon
     
         Returns:
-            List[float]: List of type effectiveness against this pokemon in PokeType order. e.g., for Fighting you can get the multiplier by list[PokeType.FIGHTING.value]
+            Tuple[float, ...]: type effectiveness against this pokemon in PokeType order. e.g., for Fighting you can get the multiplier by chart[PokeType.FIGHTING.value]
+                               Types that don't exist in this pokemon's generation are always 1. Before gen 6 there's no
+                               fairy entry, so the chart has 17 entries instead of NUM_TYPES (see Generation.chart_size)
         """
-        type_chart = []
-        for t in PokeType:
-            type_chart.insert(t.value, self.get_type_effectiveness(t))
-        return type_chart
+        return self._type_chart
 
+    def to_dict(self, include_type_chart: bool = False) -> dict:
+        """
+        Returns this pokemon as a json friendly dict
+
+        Parameters:
+            include_type_chart (bool): also include the type chart, keyed by attack type name. Only types in this pokemon's generation are included
+
+        Returns:
+            dict: e.g., {'id': 1, 'name': 'bulbasaur', 'types': ['grass', 'poison']}
+        """
+        d = {
+            'id': self.id,
+            'name': self.name,
+            'types': [TYPE_NAMES[t.value] for t in (self.type1, self.type2) if t is not None],
+        }
+        if include_type_chart:
+            generation = get_generation(self.generation)
+            d['type_chart'] = {name: self._type_chart[t.value] for name, t in zip(generation.type_names, generation.types)}
+        return d
+
+
+    def __repr__(self):
+        return f"Pokemon({self.id!r}, {self.name!r}, {self.type1}, {self.type2}, generation={self.generation})"
 
     def __str__(self):
         # No. 1
@@ -124,37 +570,924 @@ class Pokemon:
         return poke
 
 
+@timed("type_chart")
+def get_type_charts(pokemon: Sequence[Pokemon]) -> "np.ndarray":
+    """
+    Vectorized get_type_chart for a whole list of pokemon
+
+    Parameters:
+        pokemon (Sequence[Pokemon]): pokemon to get type charts for
+
+    Returns:
+        np.ndarray: (pokemon, attack type) shaped matrix of multipliers, row i is pokemon[i].get_type_chart()
+                    padded out to NUM_TYPES with neutral 1s for generations before fairy
+    """
+    import numpy as np
+    if not pokemon:
+        return np.empty((0, NUM_TYPES))
+    generation = pokemon[0].generation
+    if any(p.generation != generation for p in pokemon):
+        # mixed generations don't share a table, so there's nothing to vectorize over
+        return np.array([get_generation(p.generation).defensive_profiles[p._type_indexes()] for p in pokemon])
+    type1, type2 = zip(*(p._type_indexes() for p in pokemon))
+    return get_generation(generation).defensive_profiles[list(type1), list(type2)]
+
+
+class LRUCache:
+    _MISSING = object()
+
+    def __init__(self, maxsize: int):
+        """
+        A thread safe least recently used cache that counts its hits, misses and evictions
+
+        Parameters:
+            maxsize (int): maximum number of entries, 0 disables caching
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns the value cached for key and marks it as most recently used, or default if it isn't cached
+        """
+        with self._lock:
+            value = self._data.get(key, self._MISSING)
+            if value is self._MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """
+        Caches value for key, evicting the least recently used entry if the cache is full
+        """
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Drops every cached entry, the counters are kept
+        """
+        with self._lock:
+            self._data.clear()
+
+    def discard_if(self, predicate: Callable[[Any], bool]) -> int:
+        """
+        Drops every entry whose cached value predicate returns True for, the counters are kept
+
+        Returns:
+            int: number of entries dropped
+        """
+        with self._lock:
+            keys = [key for key, value in self._data.items() if predicate(value)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Returns:
+            Dict[str, int]: hits, misses, evictions, current size and maxsize
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self._data), "maxsize": self.maxsize}
+
+    def __len__(self):
+        return len(self._data)
+
+
+class PrefixIndex:
+    def __init__(self, names: List[str]):
+        """
+        Sorted array of names for prefix searches with bisect
+        Remembers the range matched by the last search, so a search that extends the last prefix
+        (i.e., the next keystroke) only bisects within that range instead of the whole array
+
+        Parameters:
+            names (List[str]): normalized names, one per pokedex entry. Names with hyphens are also indexed without them
+        """
+        keys = []
+        for i, name in enumerate(names):
+            keys.append((name, i))
+            if "-" in name:
+                keys.append((name.replace("-", ""), i))
+        keys.sort()
+        self._keys = [k for k, _ in keys]
+        self._indexes = [i for _, i in keys]
+        # (prefix, lo, hi) of the last search, swapped as a single tuple so concurrent searches never see half of it
+        self._last = ("", 0, len(self._keys))
+
+    def search(self, prefix: str, limit: int = SUGGESTION_LIMIT) -> List[int]:
+        """
+        Returns:
+            List[int]: pokedex indexes of up to limit names starting with prefix, in alphabetical order
+        """
+        last_prefix, lo, hi = self._last
+        if not prefix.startswith(last_prefix):
+            lo, hi = 0, len(self._keys)
+
+        lo = bisect.bisect_left(self._keys, prefix, lo, hi)
+        hi = bisect.bisect_right(self._keys, prefix + "\U0010ffff", lo, hi)
+        self._last = (prefix, lo, hi)
+
+        matches = []
+        for i in self._indexes[lo:hi]:
+            if i not in matches:
+                matches.append(i)
+                if len(matches) == limit:
+                    break
+        return matches
+
+
+class LazyPokedex:
+    def __init__(self, ids: List[int], names: List[str], type1s: bytes, type2s: bytes, generation: int):
+        """
+        Read only stand in for PokeLookup.pokedex that builds each Pokemon from the compact store's columns the first time it's asked for
+        Built pokemon are kept, so like a fully loaded pokedex each species is a single instance
+
+        Parameters:
+            ids        (List[int]): pokedex numbers in pokedex order
+            names      (List[str]): names in pokedex order
+            type1s     (bytes):     PokeType value of each pokemon's first type
+            type2s     (bytes):     PokeType value of each pokemon's second type, NO_TYPE if single typed
+            generation (int):       generation the types are from
+        """
+        self.ids = ids
+        self.names = names
+        self.generation = generation
+        self._type1s = type1s
+        self._type2s = type2s
+        self._types = list(PokeType)
+        self._pokemon: List[Pokemon] = [None] * len(ids)
+
+    def __len__(self):
+        return len(self._pokemon)
+
+    def __getitem__(self, idx: int) -> Pokemon:
+        pokemon = self._pokemon[idx]
+        if pokemon is None:
+            type2 = self._type2s[idx]
+            pokemon = Pokemon(self.ids[idx], self.names[idx], self._types[self._type1s[idx]],
+                              None if type2 == NO_TYPE else self._types[type2], self.generation)
+            self._pokemon[idx] = pokemon
+        return pokemon
+
+    def __setitem__(self, idx: int, pokemon: Pokemon):
+        # only for PokeLookup.refresh swapping in a species that changed
+        self.ids[idx] = pokemon.id
+        self.names[idx] = pokemon.name
+        self._pokemon[idx] = pokemon
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class DownloadError(Exception):
+    def __init__(self, failures: Dict[int, Exception]):
+        """
+        Raised once a download or refresh has dealt with every pokemon it could, for the ones it couldn't fetch
+
+        Parameters:
+            failures (Dict[int, Exception]): what went wrong for each pokedex number that failed
+        """
+        shown = ", ".join(f"{id} ({e})" for id, e in sorted(failures.items())[:5])
+        more = f" and {len(failures) - 5} more" if len(failures) > 5 else ""
+        super().__init__(f"failed to fetch {len(failures)} pokemon: {shown}{more}")
+        self.failures = failures
+        # filled in by a refresh with the changes it did fetch, see _refresh_pokemon_data
+        self.changed: Dict[int, dict] = {}
+
+
 class PokeLookup:
-    def __init__(self):
+    def __init__(self, json_path: str = POKEDEX_JSON_PATH, store_path: str = POKEDEX_STORE_PATH, load: bool = True,
+                 cache_size: int = FIND_CACHE_SIZE, generation: int = DEFAULT_GENERATION, fast_start: bool = False):
+        """
+        Only the exact lookup tables are built up front. The fuzzy matching names, the prefix index and type_charts are built
+        the first time something needs them
+
+        Parameters:
+            json_path  (str):  path of the raw pokedex download
+            store_path (str):  path of the compact store built from json_path
+            load       (bool): load the pokedex straight away. Pass False to download data or build the store first
+            cache_size (int):  number of find_pokemon results to keep in the LRU cache, 0 disables it
+            generation (int):  generation to look pokemon up in. Only pokemon from that generation's dex are loaded and
+                               their types and type charts are that generation's
+            fast_start (bool): only read the ids and names from the compact store, each Pokemon is built the first time a lookup
+                               returns it (see LazyPokedex). A missing or stale store is rebuilt from json_path first,
+                               so only the first fast start has to parse the json
+
+        Raises:
+            ValueError: if there's no such generation
+        """
+        self.json_path = json_path
+        self.store_path = store_path
+        self.generation = get_generation(generation).number
+        self.fast_start = fast_start
+        self._find_cache = LRUCache(cache_size)
+        self.pokedex = self._load_pokedex() if load else []
+        self._build_indexes()
+
+    def reload(self):
+        """
+        Reloads the pokedex from disk, rebuilds the indexes and invalidates every cached find_pokemon result
+        """
         self.pokedex = self._load_pokedex()
+        self._build_indexes()
+        self.invalidate_cache()
+
+    def refresh(self, base_url: str = BASE_URL, workers: int = DOWNLOAD_WORKERS, cache_dir: str = DOWNLOAD_CACHE_DIR) -> List[int]:
+        """
+        Updates the downloaded data from the api with conditional requests (see _refresh_pokemon_data) and swaps just the
+        species that changed into this pokedex. Indexes and cached find_pokemon results are only touched for those species
+
+        Parameters:
+            base_url  (str): api root to refresh from, can be pointed at a local server
+            workers   (int): number of concurrent requests
+            cache_dir (str): directory the per-pokemon checkpoint files and the manifest are in
+
+        Returns:
+            List[int]: pokedex numbers of the pokemon that changed, sorted
+
+        Raises:
+            DownloadError: if some pokemon couldn't be fetched, everything that did change is still applied
+        """
+        try:
+            changed = self._refresh_pokemon_data(base_url=base_url, workers=workers, cache_dir=cache_dir)
+        except DownloadError as e:
+            # the changes that did arrive are on disk now, keep this pokedex in step with them
+            self._apply_changes(e.changed)
+            raise
+        self._apply_changes(changed)
+        return sorted(changed)
+
+    def invalidate_cache(self):
+        """
+        Drops every cached find_pokemon result. Call this whenever self.pokedex changes
+        """
+        self._find_cache.clear()
+
+    def get_cache_stats(self) -> Dict[str, int]:
+        """
+        Returns:
+            Dict[str, int]: find_pokemon cache hits, misses, evictions, current size and maxsize
+        """
+        return self._find_cache.get_stats()
     
-    def _download_pokemon_data(self):
+    def _download_pokemon_data(self, base_url: str = BASE_URL, workers: int = DOWNLOAD_WORKERS, retries: int = DOWNLOAD_RETRIES,
+                               backoff: float = DOWNLOAD_BACKOFF, cache_dir: str = DOWNLOAD_CACHE_DIR, output_path: str = POKEDEX_JSON_PATH):
         """
         downloads pokemon data and saves locally to pokemon.json
         This local file can then be used as the app database instead of hammering pokeapi with API calls
+        Every pokemon in this PokeLookup's generation's dex is downloaded, so a generation 9 download covers every generation
+
+        Records are fetched concurrently over one keep-alive session and each one is checkpointed to cache_dir as soon as it arrives,
+        so rerunning after an interruption only fetches the pokemon that are still missing.
+        Each record's ETag, Last-Modified and content hash go in the cache manifest so _refresh_pokemon_data can ask for just the changes later
+
+        Parameters:
+            base_url    (str):   api root to download from, can be pointed at a local server
+            workers     (int):   number of concurrent requests
+            retries     (int):   how many times a failed request is retried before giving up
+            backoff     (float): seconds to wait before the first retry, doubled for every retry after that
+            cache_dir   (str):   directory the per-pokemon checkpoint files are written to
+            output_path (str):   where the combined pokedex is written
+
+        Raises:
+            DownloadError: if some pokemon couldn't be fetched, everything else is still checkpointed so a rerun only fetches those
         """
-        headers = {
-            "content-type": "application/json"
-        }
-        pokelist = []
-        
-        for x in tqdm(POKEDEX_RANGE, desc="Fetching Pokemon..."):
-            url = f"{BASE_URL}/pokemon/{x}"
-            response = requests.get(url, headers=headers)
-            d = response.json()
-            pokelist.append(d)
-        
-        with open("pokemon.json", "w") as f:
-            json.dump(pokelist, f)
+        os.makedirs(cache_dir, exist_ok=True)
+        dex_range = range(1, get_generation(self.generation).dex_size + 1)
+        missing = [x for x in dex_range if self._read_checkpoint(cache_dir, x) is None]
+
+        if missing:
+            manifest = self._read_manifest(cache_dir)
 
+            def checkpoint(id: int, record: dict, validators: Dict[str, str]):
+                self._write_checkpoint(cache_dir, id, record)
+                manifest[id] = dict(validators, sha256=_record_hash(record))
 
-    def _load_pokedex(self) -> dict:
+            try:
+                self._fetch_many(missing, base_url, workers, retries, backoff, {}, "Fetching Pokemon...", checkpoint)
+            finally:
+                # keep what did arrive, a resumed download only fetches the rest
+                self._write_manifest(cache_dir, manifest)
+
+        self._write_pokedex_json(cache_dir, dex_range, output_path)
+        self._build_compact_store(output_path, self.store_path)
+
+
+    def _refresh_pokemon_data(self, base_url: str = BASE_URL, workers: int = DOWNLOAD_WORKERS, retries: int = DOWNLOAD_RETRIES,
+                              backoff: float = DOWNLOAD_BACKOFF, cache_dir: str = DOWNLOAD_CACHE_DIR) -> Dict[int, dict]:
         """
-        Loads pokedex data from json file
+        Brings a previous download up to date without downloading everything again
+        Every pokemon is asked for with the ETag and Last-Modified from the cache manifest, so unchanged ones come back as an empty 304.
+        A full response only counts as a change if its content hash differs from the one in the manifest (servers that don't
+        support conditional requests always send everything). Nothing is rewritten if nothing changed, otherwise self.json_path is
+        rewritten and only the changed records are rewritten in the compact store, both atomically
+
+        Parameters:
+            base_url  (str):   api root to refresh from, can be pointed at a local server
+            workers   (int):   number of concurrent requests
+            retries   (int):   how many times a failed request is retried before giving up
+            backoff   (float): seconds to wait before the first retry, doubled for every retry after that
+            cache_dir (str):   directory the per-pokemon checkpoint files and the manifest are in
+
+        Returns:
+            Dict[int, dict]: the new record of every pokemon that changed, keyed by pokedex number
+
+        Raises:
+            DownloadError: if some pokemon couldn't be fetched, the changes that were fetched are still written and are in its changed
         """
-        with open("pokemon.json", "r") as f:
-            return json.load(f)
+        os.makedirs(cache_dir, exist_ok=True)
+        dex_range = range(1, get_generation(self.generation).dex_size + 1)
+        manifest = self._read_manifest(cache_dir)
+        for x in dex_range:
+            if x not in manifest:
+                # downloaded before there was a manifest, the checkpoint's hash still tells us whether a full response changed anything
+                record = self._read_checkpoint(cache_dir, x)
+                if record is not None:
+                    manifest[x] = {"etag": None, "last_modified": None, "sha256": _record_hash(record)}
+        store_current = self._store_is_current()
+
+        changed = {}
+        not_modified = 0
+
+        def compare(id: int, record: dict, validators: Dict[str, str]):
+            nonlocal not_modified
+            entry = manifest.get(id, {})
+            if record is None:
+                not_modified += 1
+                manifest[id] = dict(entry, **{k: v for k, v in validators.items() if v is not None})
+                return
+            sha256 = _record_hash(record)
+            if sha256 != entry.get("sha256"):
+                self._write_checkpoint(cache_dir, id, record)
+                changed[id] = record
+            manifest[id] = dict(validators, sha256=sha256)
 
+        try:
+            self._fetch_many(list(dex_range), base_url, workers, retries, backoff, manifest, "Refreshing Pokemon...", compare)
+        except DownloadError as e:
+            e.changed = changed
+            raise
+        finally:
+            # whatever did change goes into pokemon.json and the store before the manifest gets the new hashes, if the manifest
+            # got ahead of them the next refresh would think those changes were already applied. If writing them fails the
+            # manifest is left as it was and the next refresh picks the changes up again from their checkpoints
+            if changed or not store_current:
+                if changed or not os.path.exists(self.json_path):
+                    self._write_pokedex_json(cache_dir, dex_range, self.json_path)
+                if not (store_current and self._patch_compact_store(self.store_path, changed)):
+                    self._build_compact_store(self.json_path, self.store_path)
+            self._write_manifest(cache_dir, manifest)
+        logger.info("Refreshed %d pokemon: %d changed, %d not modified", len(dex_range), len(changed), not_modified)
+        return changed
+
+
+    def _fetch_many(self, ids: List[int], base_url: str, workers: int, retries: int, backoff: float, manifest: Dict[int, dict],
+                    desc: str, on_result: Callable[[int, dict, Dict[str, str]], None]):
+        """
+        Fetches pokemon concurrently over one keep-alive session, conditionally for any that have validators in manifest
+        on_result is called on this thread as each one arrives. A pokemon that fails doesn't stop the others, the failures
+        are raised together once every other pokemon has been dealt with. If this is interrupted (e.g., ctrl+c) requests
+        that haven't started are cancelled and the ones already done are still handed to on_result before re-raising
+
+        Parameters:
+            on_result (Callable[[int, dict, Dict[str, str]], None]): called with (pokedex number, record, validators), see _fetch_pokemon
+
+        Raises:
+            DownloadError: if any pokemon couldn't be fetched
+        """
+        import requests
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        from requests.adapters import HTTPAdapter
+        from tqdm import tqdm
+
+        failures: Dict[int, Exception] = {}
+        handled = set()
+
+        def handle(future):
+            handled.add(future)
+            try:
+                record, validators = future.result()
+            except Exception as e:
+                failures[futures[future]] = e
+                return
+            on_result(futures[future], record, validators)
+
+        with requests.Session() as session:
+            session.headers.update({"content-type": "application/json"})
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(self._fetch_pokemon, session, f"{base_url}/pokemon/{x}", retries, backoff, manifest.get(x)): x for x in ids}
+                try:
+                    for future in tqdm(as_completed(futures), total=len(futures), desc=desc):
+                        handle(future)
+                except BaseException:
+                    # stop what hasn't started, let what's in flight finish and keep everything that completed
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    for future in futures:
+                        if future not in handled and future.done() and not future.cancelled():
+                            handle(future)
+                    raise
+
+        if failures:
+            raise DownloadError(failures)
+
+
+    def _fetch_pokemon(self, session: "requests.Session", url: str, retries: int, backoff: float,
+                       validators: Dict[str, str] = None) -> Tuple[dict, Dict[str, str]]:
+        """
+        GETs a single pokemon record, retrying with exponential backoff on connection errors and retryable status codes
+
+        Parameters:
+            session    (requests.Session): shared session so connections are reused between requests
+            url        (str):              url of the pokemon record
+            retries    (int):              how many times to retry before raising
+            backoff    (float):            seconds to wait before the first retry
+            validators (Dict[str, str]):   etag and last_modified from an earlier response, makes the request conditional
+
+        Returns:
+            Tuple[dict, Dict[str, str]]: the decoded pokemon record, None if the server says it's not modified,
+                                         and the response's etag and last_modified (None where the server didn't send one)
+        """
+        import requests
+        headers = {}
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+        for attempt in range(retries + 1):
+            try:
+                response = session.get(url, headers=headers, timeout=DOWNLOAD_TIMEOUT)
+                if response.status_code in RETRY_STATUS_CODES:
+                    raise requests.HTTPError(f"{response.status_code} from {url}", response=response)
+                response.raise_for_status()
+                validators = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+                if response.status_code == 304:
+                    return None, validators
+                return response.json(), validators
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                # anything other than a retryable status (e.g., 404) won't get better by asking again
+                retryable = not isinstance(e, requests.HTTPError) or e.response.status_code in RETRY_STATUS_CODES
+                if not retryable or attempt == retries:
+                    raise
+                time.sleep(backoff * 2 ** attempt)
+
+
+    def _read_manifest(self, cache_dir: str) -> Dict[int, dict]:
+        """
+        Returns:
+            Dict[int, dict]: {pokedex number: {'etag', 'last_modified', 'sha256'}} for every checkpointed record, empty if there's no manifest yet
+        """
+        try:
+            with open(os.path.join(cache_dir, DOWNLOAD_MANIFEST), "r") as f:
+                return {int(id): entry for id, entry in json.load(f).items()}
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+
+    def _write_manifest(self, cache_dir: str, manifest: Dict[int, dict]):
+        """
+        Atomically writes the cache manifest, see _read_manifest
+        """
+        path = os.path.join(cache_dir, DOWNLOAD_MANIFEST)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({str(id): entry for id, entry in sorted(manifest.items())}, f)
+        os.replace(tmp_path, path)
+
+
+    def _write_pokedex_json(self, cache_dir: str, dex_range: range, output_path: str):
+        """
+        Atomically combines the checkpointed records in dex_range into the pokedex json at output_path
+        Every checkpoint is already a json document, so they're spliced together as text rather than parsed and dumped again
+        """
+        tmp_path = f"{output_path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write("[")
+            for x in dex_range:
+                if x > dex_range.start:
+                    f.write(", ")
+                with open(os.path.join(cache_dir, f"{x}.json"), "r") as checkpoint:
+                    f.write(checkpoint.read())
+            f.write("]")
+        os.replace(tmp_path, output_path)
+
+
+    def _read_checkpoint(self, cache_dir: str, id: int) -> dict:
+        """
+        Returns the checkpointed record for a pokemon, or None if it hasn't been downloaded yet
+        """
+        try:
+            with open(os.path.join(cache_dir, f"{id}.json"), "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+
+    def _write_checkpoint(self, cache_dir: str, id: int, record: dict):
+        """
+        Atomically writes a single pokemon record to the checkpoint directory
+        We write to a temp file first so an interrupted run never leaves a half written record behind
+        """
+        path = os.path.join(cache_dir, f"{id}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(record, f)
+        os.replace(tmp_path, path)
+
+
+    def _build_compact_store(self, json_path: str, store_path: str):
+        """
+        Projects the raw PokeAPI download down to just what lookups need (id, name and types) and writes it to store_path
+        pokemon.json carries every move, game index and sprite url for each pokemon, the compact store is a tiny fraction of that
+        Types are resolved for every generation here, so loading any generation from the store never has to look at past_types
+
+        Parameters:
+            json_path  (str): path of the raw pokedex downloaded by _download_pokemon_data
+            store_path (str): where to write the compact store
+        """
+        with open(json_path, "r") as f:
+            pokedex = json.load(f)
+        self._write_compact_store(store_path, [self._store_entry(p) for p in pokedex])
+
+
+    def _patch_compact_store(self, store_path: str, records: Dict[int, dict]) -> bool:
+        """
+        Rewrites just the given records in an existing compact store, every other record is copied over as it is
+        Records for pokedex numbers the store doesn't have yet are added in pokedex order
+
+        Parameters:
+            store_path (str):             compact store to patch, it's replaced atomically
+            records    (Dict[int, dict]): raw PokeAPI records keyed by pokedex number
+
+        Returns:
+            bool: False if store_path isn't a store we understand and nothing was written, rebuild it with _build_compact_store instead
+        """
+        entries = self._read_store_entries(store_path)
+        if entries is None:
+            return False
+        by_id = {entry[0]: entry for entry in entries}
+        for id, p in records.items():
+            by_id[id] = self._store_entry(p)
+        self._write_compact_store(store_path, [by_id[id] for id in sorted(by_id)])
+        return True
+
+
+    def _store_entry(self, p: dict) -> Tuple[int, bytes, bytes]:
+        """
+        Returns:
+            Tuple[int, bytes, bytes]: a raw PokeAPI record's pokedex number, utf-8 name and its type1, type2 pairs for
+                                      every generation, as laid out in the compact store
+        """
+        types = bytearray()
+        for generation in range(1, LATEST_GENERATION + 1):
+            type1, type2 = self._resolve_types(p, generation)
+            types += bytes((type1.value, NO_TYPE if type2 is None else type2.value))
+        return p['id'], p['name'].encode("utf-8"), bytes(types)
+
+
+    def _read_store_entries(self, store_path: str) -> List[Tuple[int, bytes, bytes]]:
+        """
+        Splits a compact store back into one entry per record, see _store_entry
+
+        Returns:
+            List[Tuple[int, bytes, bytes]]: entries in store order, or None if the file is missing or isn't a store we understand
+        """
+        try:
+            with open(store_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        if len(data) < STORE_HEADER.size:
+            return None
+        magic, version, count, generations = STORE_HEADER.unpack_from(data)
+        if magic != STORE_MAGIC or version != STORE_VERSION or generations != LATEST_GENERATION:
+            return None
+
+        types_offset = STORE_HEADER.size + count * STORE_RECORD.size
+        names_offset = types_offset + count * generations * 2
+        entries = []
+        for i, (id, name_len) in enumerate(struct.iter_unpack(STORE_RECORD.format, data[STORE_HEADER.size:types_offset])):
+            types = data[types_offset + i * generations * 2:types_offset + (i + 1) * generations * 2]
+            entries.append((id, data[names_offset:names_offset + name_len], types))
+            names_offset += name_len
+        return entries
+
+
+    def _write_compact_store(self, store_path: str, entries: List[Tuple[int, bytes, bytes]]):
+        """
+        Atomically writes entries (see _store_entry) to store_path in the given order
+        """
+        records = b"".join(STORE_RECORD.pack(id, len(name)) for id, name, _ in entries)
+        types = b"".join(t for _, _, t in entries)
+        names = b"".join(name for _, name, _ in entries)
+        data = STORE_HEADER.pack(STORE_MAGIC, STORE_VERSION, len(entries), LATEST_GENERATION) + records + types + names
+
+        tmp_path = f"{store_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, store_path)
+
+
+    def _resolve_types(self, p: dict, generation: int) -> Tuple[PokeType, PokeType]:
+        """
+        Works out what types a raw PokeAPI pokemon record had in a generation
+
+        Parameters:
+            p          (dict): pokemon record as returned by the /pokemon endpoint
+            generation (int):  generation number
+
+        Returns:
+            Tuple[PokeType, PokeType]: type1 and type2, type2 is None for single typed pokemon
+        """
+        types = p['types']
+        resolved_by = None
+        for t in p['past_types']:
+            # e.g., "generation-v" means the pokemon was <past_types> in generation 5 and earlier
+            # e.g., clefairy was normal through gen 5 and became fairy in gen 6
+            # so the earliest entry at or after the generation we want wins, and current types apply if there isn't one
+            past = GENERATION_NAMES.get(t['generation']['name'])
+            if past is not None and past >= generation and (resolved_by is None or past < resolved_by):
+                resolved_by = past
+                types = t['types']
+
+        type1 = PokeType[types[0]['type']['name'].upper()]
+        type2 = PokeType[types[1]['type']['name'].upper()] if len(types) > 1 else None
+        return type1, type2
+
+
+    def _project_pokemon(self, p: dict) -> Pokemon:
+        """
+        Reduces a raw PokeAPI pokemon record to its id, name and types in this PokeLookup's generation
+
+        Parameters:
+            p (dict): pokemon record as returned by the /pokemon endpoint
+
+        Returns:
+            Pokemon: the pokemon with its types for this generation already resolved
+        """
+        type1, type2 = self._resolve_types(p, self.generation)
+        return Pokemon(p['id'], p['name'], type1, type2, self.generation)
+
+
+    @timed("load")
+    def _load_pokedex(self) -> List[Pokemon]:
+        """
+        Loads this generation's pokedex, preferring the compact store and falling back to the raw json download
+        The store is skipped if it's missing, older than pokemon.json or was written by a different store version
+
+        Returns:
+            List[Pokemon]: one pokemon per species in this generation's dex, in pokedex order. See _project_pokemon
+                           A LazyPokedex with fast_start
+        """
+        if self._store_is_current():
+            pokedex = self._load_compact_store(self.store_path)
+            if pokedex is not None:
+                return pokedex
+
+        if self.fast_start and os.path.exists(self.json_path):
+            # parse the json once to bring the store up to date, every fast start after this one reads the store
+            self._build_compact_store(self.json_path, self.store_path)
+            return self._load_compact_store(self.store_path)
+
+        dex_size = get_generation(self.generation).dex_size
+        with open(self.json_path, "r") as f:
+            return [self._project_pokemon(p) for p in json.load(f) if p['id'] <= dex_size]
+
+
+    def _store_is_current(self) -> bool:
+        """
+        Returns:
+            bool: whether the compact store exists and is at least as new as pokemon.json (or there's no pokemon.json)
+        """
+        return os.path.exists(self.store_path) and (not os.path.exists(self.json_path) or os.path.getmtime(self.store_path) >= os.path.getmtime(self.json_path))
+
+
+    def _load_compact_store(self, store_path: str) -> List[Pokemon]:
+        """
+        Reads the compact store written by _build_compact_store with a single read
+
+        Returns:
+            List[Pokemon]: this generation's pokemon in pokedex order, or None if the file isn't a store we understand
+                           A LazyPokedex with fast_start
+        """
+        with open(store_path, "rb") as f:
+            data = f.read()
+
+        if len(data) < STORE_HEADER.size:
+            return None
+        magic, version, count, generations = STORE_HEADER.unpack_from(data)
+        if magic != STORE_MAGIC or version != STORE_VERSION or self.generation > generations:
+            return None
+
+        types = list(PokeType)
+        dex_size = get_generation(self.generation).dex_size
+        types_offset = STORE_HEADER.size + count * STORE_RECORD.size
+        names_offset = types_offset + count * generations * 2
+        records = struct.iter_unpack(STORE_RECORD.format, data[STORE_HEADER.size:types_offset])
+        # every record has a type1, type2 pair per generation, so stepping over whole runs picks out this generation's pairs
+        first = types_offset + (self.generation - 1) * 2
+        type1s = data[first:names_offset:generations * 2]
+        type2s = data[first + 1:names_offset:generations * 2]
+
+        ids, names, dex_type1s, dex_type2s = [], [], bytearray(), bytearray()
+        for (id, name_len), type1, type2 in zip(records, type1s, type2s):
+            if id <= dex_size:
+                ids.append(id)
+                names.append(data[names_offset:names_offset + name_len].decode("utf-8"))
+                dex_type1s.append(type1)
+                dex_type2s.append(type2)
+            names_offset += name_len
+
+        if self.fast_start:
+            return LazyPokedex(ids, names, bytes(dex_type1s), bytes(dex_type2s), self.generation)
+        return [Pokemon(id, name, types[type1], None if type2 == NO_TYPE else types[type2], self.generation)
+                for id, name, type1, type2 in zip(ids, names, dex_type1s, dex_type2s)]
+
+
+
+    def _build_indexes(self):
+        """
+        Builds the name and id lookup tables used for exact matches
+        Names are indexed by their normalized form and again with hyphens removed, so "mrmime" and "hooh" still hit exactly
+        """
+        if isinstance(self.pokedex, LazyPokedex):
+            # read straight off the store's columns so no Pokemon gets built
+            ids, names = self.pokedex.ids, self.pokedex.names
+        else:
+            ids, names = [p.id for p in self.pokedex], [p.name for p in self.pokedex]
+        self._names = names
+
+        self._id_index: Dict[int, int] = {}
+        self._name_index: Dict[str, int] = {}
+        for i, (id, name) in enumerate(zip(ids, names)):
+            self._id_index[id] = i
+            self._name_index[name] = i
+            self._name_index.setdefault(name.replace("-", ""), i)
+
+        for alias, name in POKEMON_ALIASES.items():
+            if name in self._name_index:
+                self._name_index.setdefault(alias, self._name_index[name])
+
+        # only exact lookups need the tables above, these are built by the properties below the first time they're used
+        self._lazy_fuzzy_names = None
+        self._lazy_prefix_index = None
+        self._lazy_type_charts = None
+
+
+    @property
+    def _fuzzy_names(self) -> List[str]:
+        """
+        Names pre-processed once for fuzzy matching so rapidfuzz doesn't have to redo it for every query
+        """
+        if self._lazy_fuzzy_names is None:
+            from rapidfuzz import utils
+            self._lazy_fuzzy_names = [utils.default_process(name) for name in self._names]
+        return self._lazy_fuzzy_names
+
+
+    @property
+    def _prefix_index(self) -> PrefixIndex:
+        if self._lazy_prefix_index is None:
+            self._lazy_prefix_index = PrefixIndex(self._names)
+        return self._lazy_prefix_index
+
+
+    @property
+    def type_charts(self) -> "np.ndarray":
+        """
+        Every pokemon's type chart in pokedex order, (pokemon, attack type) shaped and read only
+        """
+        if self._lazy_type_charts is None:
+            type_charts = get_type_charts(self.pokedex)
+            type_charts.flags.writeable = False
+            self._lazy_type_charts = type_charts
+        return self._lazy_type_charts
+
+
+    def _apply_changes(self, records: Dict[int, dict]):
+        """
+        Replaces the loaded pokemon for each changed record and brings the indexes and the find_pokemon cache up to date for just those
+        A changed name also changes which fuzzy matches other queries get, so then every cached result is dropped and the prefix index is rebuilt
+
+        Parameters:
+            records (Dict[int, dict]): new raw PokeAPI records keyed by pokedex number, as returned by _refresh_pokemon_data
+        """
+        dex_size = get_generation(self.generation).dex_size
+        records = {id: p for id, p in records.items() if id <= dex_size}
+        if not records:
+            return
+        if any(id not in self._id_index for id in records):
+            # a species this pokedex doesn't have yet shifts every index after it, so start over
+            self.reload()
+            return
+
+        indexes = []
+        renamed = False
+        for id, p in records.items():
+            idx = self._id_index[id]
+            old, new = self.pokedex[idx], self._project_pokemon(p)
+            self.pokedex[idx] = new
+            indexes.append(idx)
+            if new.name != old.name:
+                renamed = True
+                self._rename(idx, new.name)
+
+        if self._lazy_type_charts is not None:
+            type_charts = self._lazy_type_charts.copy()
+            type_charts[indexes] = get_type_charts([self.pokedex[idx] for idx in indexes])
+            type_charts.flags.writeable = False
+            self._lazy_type_charts = type_charts
+
+        if renamed:
+            self._lazy_prefix_index = None
+            self.invalidate_cache()
+        else:
+            self._find_cache.discard_if(lambda poke: poke is not None and poke.id in records)
+
+
+    def _rename(self, idx: int, name: str):
+        """
+        Points the exact and fuzzy lookup tables for the pokemon at idx at its new name
+        """
+        for key in [key for key, i in self._name_index.items() if i == idx]:
+            del self._name_index[key]
+        self._name_index[name] = idx
+        self._name_index.setdefault(name.replace("-", ""), idx)
+        for alias, target in POKEMON_ALIASES.items():
+            if target == name:
+                self._name_index.setdefault(alias, idx)
+
+        self._names[idx] = name
+        if self._lazy_fuzzy_names is not None:
+            from rapidfuzz import utils
+            self._lazy_fuzzy_names[idx] = utils.default_process(name)
+
+
+    @timed("exact")
+    def _find_exact(self, search_name: str) -> int:
+        """
+        Looks up a pokemon by exact name, alias or pokedex number (e.g., "25" or "#025")
+
+        Returns:
+            int: index of the pokemon in self.pokedex, or None if there is no exact match
+        """
+        search_id = search_name.strip().lstrip("#")
+        # not isdigit, that's also true for characters int() rejects like "²"
+        if search_id.isdecimal():
+            return self._id_index.get(int(search_id))
+
+        name = normalize_name(search_name)
+        match = self._name_index.get(name)
+        if match is None:
+            match = self._name_index.get(name.replace("-", ""))
+        return match
+
+
+    def suggest(self, prefix: str, limit: int = SUGGESTION_LIMIT) -> List[Pokemon]:
+        """
+        Suggestions for a partially typed name, meant to be called on every keystroke
+        Names starting with prefix come first, if there aren't any the best fuzzy matches are used instead
+
+        Parameters:
+            prefix (str): what has been typed so far
+            limit  (int): maximum number of suggestions
+
+        Returns:
+            List[Pokemon]: suggested pokemon, best first
+        """
+        if prefix.strip().lstrip("#").isdecimal():
+            match = self._find_exact(prefix)
+            return [] if match is None else [self._build_pokemon(match)]
+
+        name = normalize_name(prefix)
+        if not name:
+            return []
+
+        matches = self._prefix_index.search(name, limit)
+        if matches:
+            return [self._build_pokemon(i) for i in matches]
+        return [p for p, _ in self.find_candidates(prefix, limit, SUGGESTION_SCORE_CUTOFF)]
 
 
     def find_pokemon(self, search_name) -> Pokemon:
@@ -169,56 +1502,112 @@ class PokeLookup:
             Pokemon: instance of Pokemon with pokemon's details
 
         """
-        match = None
-        fuzz_idx = None
-        fuzz_ratio = 0
-        
-        for i, p in enumerate(self.pokedex):
+        key = normalize_name(search_name)
+        poke = self._find_cache.get(key, LRUCache._MISSING)
+        if poke is LRUCache._MISSING:
+            poke = self._resolve(search_name)
+            self._find_cache.put(key, poke)
+        return poke
 
-            # check for an exact match. If we get one then we can break the loop
-            if p['name'] == search_name.lower() or str(p['id']) == search_name:
-                match = i
-                break
-            
-            # check for fuzzy matches, we'll keep track of the best match and then use that if we don't end up getting an exact match
-            temp_ratio = fuzz.ratio(search_name, p['name'], processor=utils.default_process)
-            if temp_ratio > fuzz_ratio:
-                fuzz_idx = i
-                fuzz_ratio = temp_ratio
+
+    def _resolve(self, search_name: str) -> Pokemon:
+        """
+        Does the actual find_pokemon lookup, bypassing the cache
+        """
+        # check for an exact match first, that's just a dictionary lookup
+        match = self._find_exact(search_name)
 
         if match is None:
-            print(f"Using fuzzy match: {fuzz_idx}")
+            # no exact match so use the best fuzzy match instead
+            candidates = self._rank_candidates(search_name, k=1)
+            fuzz_idx = candidates[0][0] if candidates and candidates[0][1] > 0 else None
+            logger.debug("Using fuzzy match: %s", fuzz_idx)
             match = fuzz_idx
+            instrumentation.count("fuzzy_matches" if match is not None else "misses")
         else:
-            print(f"Using exact match: {match}")
+            logger.debug("Using exact match: %s", match)
+            instrumentation.count("exact_matches")
 
-        # this shouldn't ever happen since we're just using best fuzzy match when theres no exact match, but just in case
+        # this can only happen if nothing in the pokedex shares a single character with the search
         if match is None:
             return None
-        
-        p = self.pokedex[match]
 
-        id = p['id']
-        name = p['name']
-        current_type1 = p['types'][0]['type']['name']
-        current_type2 = p['types'][1]['type']['name'] if len(p['types']) > 1 else None
+        return self._build_pokemon(match)
 
-        type1 = current_type1
-        type2 = current_type2
 
-        for t in p['past_types']:
-            # e.g., "generation-v" means the pokemon was <past_types> in generation 5 and earlier
-            # e.g., clefairy was normal through gen 5 and became fairy in gen 6
-            # we only intend to support gen 3 pokemon and type changes were only made after gen 1 and after gen 5
-            # So use gen 5 past_types if they exist, otherwise use types
-            if t['generation']['name'] == "generation-v":
-                type1 = t['types'][0]['type']['name']
-                type2 = t['types'][1]['type']['name'] if len(t['types']) > 1 else None
-
-        poketype1 = PokeType[type1.upper()]
-        poketype2 = PokeType[type2.upper()] if type2 is not None else None
-        poke = Pokemon(id, name, poketype1, poketype2)
-        return poke
+    def find_candidates(self, query: str, k: int = FUZZY_CANDIDATES, score_cutoff: float = 0) -> List[Tuple[Pokemon, float]]:
+        """
+        Ranks the pokedex by fuzzy similarity to query and returns the best k matches
+
+        Parameters:
+            query        (str):   name to match, it gets the same processing as the pokedex names
+            k            (int):   maximum number of candidates to return
+            score_cutoff (float): candidates scoring below this (0-100) are dropped
+
+        Returns:
+            List[Tuple[Pokemon, float]]: (pokemon, score) pairs, best match first
+        """
+        return [(self._build_pokemon(i), score) for i, score in self._rank_candidates(query, k, score_cutoff)]
+
+
+    @timed("fuzzy")
+    def _rank_candidates(self, query: str, k: int, score_cutoff: float = 0) -> List[Tuple[int, float]]:
+        """
+        Scores query against every pre-processed pokedex name in one rapidfuzz call
+
+        Returns:
+            List[Tuple[int, float]]: (pokedex index, score) pairs, best match first
+        """
+        from rapidfuzz import fuzz, process, utils
+        results = process.extract(utils.default_process(query), self._fuzzy_names, scorer=fuzz.ratio, processor=None,
+                                  limit=k, score_cutoff=score_cutoff)
+        return [(i, score) for _, score, i in results]
+
+
+    def match_many(self, queries: List[str], score_cutoff: float = 0, workers: int = -1) -> List[Pokemon]:
+        """
+        Resolves a batch of names the same way find_pokemon would, but scores every query that needs a fuzzy match in bulk
+
+        Parameters:
+            queries      (List[str]): names or pokedex numbers to resolve
+            score_cutoff (float):     fuzzy matches scoring at or below this (0-100) resolve to None
+            workers      (int):       threads rapidfuzz may use for scoring, -1 uses every core
+
+        Returns:
+            List[Pokemon]: resolved pokemon in the same order as queries, None where nothing matched
+        """
+        matches = [self._find_exact(q) for q in queries]
+        fuzzy = [i for i, m in enumerate(matches) if m is None]
+        if fuzzy:
+            # a batch of exact matches never has to import these
+            import numpy as np
+            from rapidfuzz import fuzz, process, utils
+        instrumentation.count("exact_matches", len(queries) - len(fuzzy))
+
+        for start in range(0, len(fuzzy), MATCH_MANY_CHUNK):
+            chunk = fuzzy[start:start + MATCH_MANY_CHUNK]
+            with instrumentation.stage("fuzzy"):
+                scores = process.cdist([utils.default_process(queries[i]) for i in chunk], self._fuzzy_names,
+                                       scorer=fuzz.ratio, processor=None, workers=workers)
+            best = np.argmax(scores, axis=1)
+            best_scores = scores[np.arange(len(chunk)), best]
+            for i, idx, score in zip(chunk, best, best_scores):
+                if score > score_cutoff:
+                    matches[i] = int(idx)
+        if instrumentation.enabled:
+            misses = sum(matches[i] is None for i in fuzzy)
+            instrumentation.count("fuzzy_matches", len(fuzzy) - misses)
+            instrumentation.count("misses", misses)
+
+        return [None if m is None else self._build_pokemon(m) for m in matches]
+
+
+    @timed("build")
+    def _build_pokemon(self, idx: int) -> Pokemon:
+        """
+        Returns the pokedex's Pokemon at idx, every lookup shares these so nothing is allocated per call
+        """
+        return self.pokedex[idx]
 
 
 ################################################################################
@@ -226,17 +1615,42 @@ class PokeLookup:
 #  Purpose:   do all the stuff                                                 #
 ################################################################################
 def main():
-    # download_pokemon_data()
-    pokelookup = PokeLookup()
+    parser = argparse.ArgumentParser(description="Lookup Pokemon types and weaknesses")
+    parser.add_argument("--download", action="store_true", help="download pokemon.json from pokeapi (resumes an interrupted download) and build the compact store")
+    parser.add_argument("--refresh", action="store_true", help="re-check every downloaded pokemon with conditional requests and rewrite only the ones that changed")
+    parser.add_argument("--build-store", action="store_true", help=f"rebuild {POKEDEX_STORE_PATH} from an existing {POKEDEX_JSON_PATH}")
+    parser.add_argument("-g", "--generation", type=int, default=DEFAULT_GENERATION, choices=sorted(GENERATION_DEX_SIZES),
+                        help="generation to look pokemon up in, --download fetches every pokemon up to this generation")
+    parser.add_argument("--fast-start", action="store_true", help="only load what exact lookups need at startup, everything else loads on first use")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log how each lookup was matched")
+    parser.add_argument("--metrics", choices=["json", "prometheus"], help="time the lookup stages and print the metrics in this format on exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(message)s")
+    if args.metrics:
+        instrumentation.enable()
+        atexit.register(lambda: print(instrumentation.to_json() if args.metrics == "json" else instrumentation.to_prometheus()))
+
+    if args.download or args.refresh or args.build_store:
+        pokelookup = PokeLookup(load=False, generation=args.generation)
+        if args.download:
+            pokelookup._download_pokemon_data()
+        elif args.refresh:
+            pokelookup._refresh_pokemon_data()
+        else:
+            pokelookup._build_compact_store(pokelookup.json_path, pokelookup.store_path)
+        sys.exit(0)
 
-    print(TYPE_CHART[PokeType.NORMAL.value])
-    print(f"Ghost attacking Normal. Expecting 0: {TYPE_CHART[PokeType.GHOST.value][PokeType.NORMAL.value]}")
-    print(f"Normal attacking Ghost. Expecting 0: {TYPE_CHART[PokeType.NORMAL.value][PokeType.GHOST.value]}")
-    print(f"Fighting attacking Normal. Expecting 2: {TYPE_CHART[PokeType.FIGHTING.value][PokeType.NORMAL.value]}")
-    print(f"Dark attacking Ghost. Expecting 2: {TYPE_CHART[PokeType.DARK.value][PokeType.GHOST.value]}")
-    print(f"Dark attacking Dark. Expecting 0.5: {TYPE_CHART[PokeType.DARK.value][PokeType.DARK.value]}")
-    print(f"Ice attacking Steel. Expecting 0.5: {TYPE_CHART[PokeType.ICE.value][PokeType.STEEL.value]}")
+    pokelookup = PokeLookup(generation=args.generation, fast_start=args.fast_start)
 
+    # type chart sanity checks, shown with -v
+    logger.debug("%s", BASE_TYPE_CHART[PokeType.NORMAL.value])
+    logger.debug("Ghost attacking Normal. Expecting 0: %s", BASE_TYPE_CHART[PokeType.GHOST.value][PokeType.NORMAL.value])
+    logger.debug("Normal attacking Ghost. Expecting 0: %s", BASE_TYPE_CHART[PokeType.NORMAL.value][PokeType.GHOST.value])
+    logger.debug("Fighting attacking Normal. Expecting 2: %s", BASE_TYPE_CHART[PokeType.FIGHTING.value][PokeType.NORMAL.value])
+    logger.debug("Dark attacking Ghost. Expecting 2: %s", BASE_TYPE_CHART[PokeType.DARK.value][PokeType.GHOST.value])
+    logger.debug("Dark attacking Dark. Expecting 0.5: %s", BASE_TYPE_CHART[PokeType.DARK.value][PokeType.DARK.value])
+    logger.debug("Ice attacking Steel. Expecting 0.5: %s", BASE_TYPE_CHART[PokeType.ICE.value][PokeType.STEEL.value])
 
     while True:
         print("What pokemon would you like to lookup?")
@@ -0,0 +1,118 @@
+import os
+import logging
+import threading
+import customtkinter
+from collections import OrderedDict
+from PIL import Image, PngImagePlugin
+from pokelookup_core import PokeType, timed
+from pokelookup_sprites import BASE_IMAGE_PATH, SPRITE_BUNDLE_PATH, SpriteBundle, sprite_key
+
+
+TYPE_SPRITE_SIZE = (144, 32)
+POKEMON_SPRITE_SIZE = (192, 192)
+
+SPRITE_CACHE_BYTES = 16 * 1024 * 1024 # decoded sprites are evicted least recently used first once they take up more than this
+UNKNOWN_SPRITE_ID = 0 # sprites/pokemon/0.png is the placeholder shown when a search doesn't find anything
+
+logger = logging.getLogger(__name__)
+
+
+class ImageCache:
+    def __init__(self, sprite_cache_bytes: int = SPRITE_CACHE_BYTES, sprite_dir: str = BASE_IMAGE_PATH, bundle_path: str = SPRITE_BUNDLE_PATH):
+        """
+        Hands out shared CTkImages so each image file is only read and decoded once
+        Type badges are few and small so they're kept forever, pokemon sprites are kept in an LRU bounded by decoded size
+
+        Images are read from the sprite bundle (see pokelookup_sprites.build_sprite_bundle) when there is one,
+        anything missing from the bundle is read from the loose files in sprite_dir. A bundle that can't be read
+        (e.g., one built by an older version) is skipped with a warning and everything comes from the loose files
+
+        Parameters:
+            sprite_cache_bytes (int): memory budget for decoded pokemon sprites
+            sprite_dir         (str): folder holding the loose pokemon and types sprite folders
+            bundle_path        (str): path of the sprite bundle, it's fine if it doesn't exist
+        """
+        self.sprite_cache_bytes = sprite_cache_bytes
+        self.sprite_dir = sprite_dir
+        self.bundle = None
+        if os.path.exists(bundle_path):
+            try:
+                self.bundle = SpriteBundle(bundle_path)
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring sprite bundle %s, reading loose sprites instead (rebuild it with pokelookup_sprites.py): %s", bundle_path, e)
+        self._type_images = {}
+        self._sprites = OrderedDict() # pokemon id -> (CTkImage, decoded size in bytes)
+        self._sprite_bytes = 0
+        self._lock = threading.Lock()
+
+
+    @timed("image_decode")
+    def _load_image(self, folder: str, name: str) -> Image.Image:
+        """
+        Opens and fully decodes sprites/<folder>/<name>.png so the file is closed and nothing is decoded lazily later on
+        """
+        key = sprite_key(folder, name)
+        if self.bundle is not None and key in self.bundle:
+            # every bundled sprite is a png, opening it as one directly skips Image.open probing (and importing) other formats
+            image = PngImagePlugin.PngImageFile(self.bundle.open(key))
+        else:
+            image = Image.open(os.path.join(self.sprite_dir, folder, f"{name}.png"))
+        image.load()
+        return image
+
+
+    def _get_type_image(self, file_name: str) -> customtkinter.CTkImage:
+        with self._lock:
+            image_ctk = self._type_images.get(file_name)
+            if image_ctk is None:
+                try:
+                    image = self._load_image("types", file_name)
+                except FileNotFoundError:
+                    # badges for types newer than the sprite set (e.g., fairy) show as unknown
+                    image = self._load_image("types", "unknown")
+                image_ctk = customtkinter.CTkImage(dark_image=image, light_image=image, size=TYPE_SPRITE_SIZE)
+                self._type_images[file_name] = image_ctk
+            return image_ctk
+
+
+    def get_type_image(self, poke_type: PokeType) -> customtkinter.CTkImage:
+        """
+        Returns the badge for poke_type, or the empty badge if poke_type is None (e.g., a single typed pokemon's type 2)
+        """
+        return self._get_type_image("none" if poke_type is None else str(poke_type.value))
+
+
+    def get_unknown_type_image(self) -> customtkinter.CTkImage:
+        """
+        Returns the "???" badge shown before a search or when a search fails
+        """
+        return self._get_type_image("unknown")
+
+
+    def get_sprite(self, id: int) -> customtkinter.CTkImage:
+        """
+        Returns the sprite for the pokemon with the given pokedex number, use UNKNOWN_SPRITE_ID for the placeholder
+
+        Parameters:
+            id (int): pokedex number
+
+        Returns:
+            customtkinter.CTkImage: the sprite, shared between every caller asking for the same pokemon
+        """
+        with self._lock:
+            cached = self._sprites.get(id)
+            if cached is not None:
+                self._sprites.move_to_end(id)
+                return cached[0]
+
+            image = self._load_image("pokemon", str(id))
+            image_ctk = customtkinter.CTkImage(dark_image=image, light_image=image, size=POKEMON_SPRITE_SIZE)
+            size = image.width * image.height * len(image.getbands())
+            self._sprites[id] = (image_ctk, size)
+            self._sprite_bytes += size
+
+            # always keep the sprite we just loaded even if it's bigger than the whole budget on its own
+            while self._sprite_bytes > self.sprite_cache_bytes and len(self._sprites) > 1:
+                _, (_, evicted_size) = self._sprites.popitem(last=False)
+                self._sprite_bytes -= evicted_size
+            return image_ctk
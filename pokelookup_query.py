@@ -0,0 +1,163 @@
+import argparse
+import numpy as np
+from typing import Dict, List, Sequence, Tuple
+from pokelookup_core import DEFAULT_GENERATION, GENERATION_DEX_SIZES, PokeType, Pokemon, PokeLookup, get_generation, timed
+
+
+# every multiplier a single attack can have against a single or dual typed pokemon
+MULTIPLIERS = (0, 0.25, 0.5, 1, 2, 4)
+# condition names and the multipliers they match, e.g. "resists" is 1/4 or 1/2 (immunities are separate)
+RELATIONS = {
+    "immune":  (0,),
+    "resists": (0.25, 0.5),
+    "neutral": (1,),
+    "weak":    (2, 4),
+    "0x":      (0,),
+    "0.25x":   (0.25,),
+    "0.5x":    (0.5,),
+    "1x":      (1,),
+    "2x":      (2,),
+    "4x":      (4,),
+}
+
+Condition = Tuple[str, PokeType] # (relation, attack type), e.g. ("immune", PokeType.GROUND)
+
+
+def parse_condition(text: str) -> Condition:
+    """
+    Parses a condition as written on the command line, e.g. "immune:ground", "resists:fire" or "4x:ice"
+
+    Raises:
+        ValueError: if the relation or the type isn't one we know
+    """
+    relation, _, type_name = text.lower().partition(":")
+    if relation not in RELATIONS:
+        raise ValueError(f"unknown relation '{relation}' in '{text}', expected one of {', '.join(RELATIONS)}")
+    try:
+        return relation, PokeType[type_name.upper()]
+    except KeyError:
+        raise ValueError(f"unknown type '{type_name}' in '{text}'") from None
+
+
+class TypeIndex:
+    def __init__(self, pokelookup: PokeLookup):
+        """
+        Answers reverse type queries ("which pokemon are immune to ground and resist fire") over a whole pokedex
+        For every multiplier in MULTIPLIERS and every attack type there's a bitset over the pokedex, packed 8 pokemon to a
+        byte, of which pokemon take that multiplier from that attack type. A query is then a handful of vectorized ANDs and
+        ORs over those bitsets. The bitsets are rebuilt whenever pokelookup.type_charts changes (e.g., after a refresh)
+
+        Parameters:
+            pokelookup (PokeLookup): loaded pokedex to search
+        """
+        self.pokelookup = pokelookup
+        self.generation = get_generation(pokelookup.generation)
+        self._type_charts = None
+        self._build()
+
+
+    def _build(self):
+        """
+        Packs the bitsets from pokelookup.type_charts
+        """
+        type_charts = self.pokelookup.type_charts # (pokemon, attack type)
+        self._type_charts = type_charts
+        self.count = len(type_charts)
+        # (multiplier, attack type, pokemon) then packed along pokemon
+        matches = type_charts.T[None, :, :] == np.array(MULTIPLIERS)[:, None, None]
+        self.bitsets = np.packbits(matches, axis=2)
+        self.bitsets.flags.writeable = False
+        # the bitsets for each relation, (attack type, packed pokemon) shaped
+        self._relations: Dict[str, np.ndarray] = {}
+        for relation, multipliers in RELATIONS.items():
+            bits = np.bitwise_or.reduce(self.bitsets[[MULTIPLIERS.index(m) for m in multipliers]], axis=0)
+            bits.flags.writeable = False
+            self._relations[relation] = bits
+
+
+    def _bits(self, condition: Condition) -> np.ndarray:
+        relation, attack_type = condition
+        if attack_type not in self.generation.types:
+            raise ValueError(f"{attack_type.name.lower()} isn't a type in generation {self.generation.number}")
+        return self._relations[relation][attack_type.value]
+
+
+    @timed("type_query")
+    def select(self, all_of: Sequence[Condition] = (), any_of: Sequence[Condition] = (), none_of: Sequence[Condition] = ()) -> np.ndarray:
+        """
+        Finds the pokemon matching a compound condition
+
+        Parameters:
+            all_of  (Sequence[Condition]): every one of these has to hold
+            any_of  (Sequence[Condition]): at least one of these has to hold, ignored if empty
+            none_of (Sequence[Condition]): none of these can hold
+
+        Returns:
+            np.ndarray: pokedex indexes of the matching pokemon in pokedex order
+
+        Raises:
+            ValueError: if a condition uses a type that isn't in the pokedex's generation
+        """
+        if self.pokelookup.type_charts is not self._type_charts:
+            self._build()
+
+        mask = np.full(self.bitsets.shape[2], 0xFF, dtype=np.uint8)
+        for condition in all_of:
+            mask &= self._bits(condition)
+        if any_of:
+            mask &= np.bitwise_or.reduce([self._bits(condition) for condition in any_of])
+        for condition in none_of:
+            mask &= ~self._bits(condition)
+        return np.flatnonzero(np.unpackbits(mask, count=self.count))
+
+
+    def find(self, all_of: Sequence[Condition] = (), any_of: Sequence[Condition] = (), none_of: Sequence[Condition] = ()) -> List[Pokemon]:
+        """
+        Same as select, but returns the matching pokemon themselves
+        """
+        return [self.pokelookup._build_pokemon(int(idx)) for idx in self.select(all_of, any_of, none_of)]
+
+
+################################################################################
+#  Function:  main                                                             #
+#  Purpose:   list the pokemon matching the conditions on the command line     #
+################################################################################
+def main():
+    parser = argparse.ArgumentParser(description="Find pokemon by how attack types affect them, e.g. immune:ground resists:fire",
+                                     epilog=f"conditions are <relation>:<type>, relations are {', '.join(RELATIONS)}")
+    parser.add_argument("conditions", nargs="*", help="conditions that must all hold")
+    parser.add_argument("--any", action="append", default=[], metavar="CONDITION", help="at least one of these must hold, repeatable")
+    parser.add_argument("--not", action="append", default=[], dest="none", metavar="CONDITION", help="exclude pokemon where this holds, repeatable")
+    parser.add_argument("-g", "--generation", type=int, default=DEFAULT_GENERATION, choices=sorted(GENERATION_DEX_SIZES), help="generation to search")
+    parser.add_argument("-c", "--count", action="store_true", help="only print how many pokemon match")
+    args = parser.parse_args()
+
+    try:
+        all_of = [parse_condition(c) for c in args.conditions]
+        any_of = [parse_condition(c) for c in args.any]
+        none_of = [parse_condition(c) for c in args.none]
+    except ValueError as e:
+        parser.error(str(e))
+    if not (all_of or any_of or none_of):
+        parser.error("give at least one condition")
+
+    index = TypeIndex(PokeLookup(generation=args.generation))
+    try:
+        matches = index.find(all_of, any_of, none_of)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.count:
+        print(len(matches))
+        return
+    for p in matches:
+        types = p.type1.name.title() + (f" | {p.type2.name.title()}" if p.type2 is not None else "")
+        print(f"#{p.id:03} {p.name.title():<16} {types}")
+    print(f"{len(matches)} pokemon")
+
+
+################################################################################
+#  Script entry point                                                          #
+################################################################################
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+import json
+import signal
+import socket
+import argparse
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import List
+from urllib.parse import parse_qs, urlparse
+from pokelookup_core import DEFAULT_GENERATION, FUZZY_CANDIDATES, GENERATION_DEX_SIZES, POKEDEX_JSON_PATH, POKEDEX_STORE_PATH, PokeLookup, instrumentation
+from pokelookup_shm import SharedPokedex, SharedPokeLookup
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_WORKERS = 8
+MAX_BATCH_SIZE = 10000 # queries accepted in a single POST body
+MAX_BODY_BYTES = 1024 * 1024
+MAX_CANDIDATES = 100 # k is clamped to 1..MAX_CANDIDATES on /candidates
+IDLE_TIMEOUT = 30 # seconds a keep-alive connection can sit idle before it's dropped and its worker freed
+
+
+class RequestError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _number(params: dict, name: str, default: float, cast: type, low: float, high: float) -> float:
+    """
+    Reads a numeric request parameter, from a query string or a json body, and clamps it to low..high
+
+    Raises:
+        RequestError: 400 if the parameter isn't a number
+    """
+    value = params.get(name, default)
+    try:
+        # bool is an int and a list or object would make cast raise TypeError, neither is a number here
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            raise ValueError
+        value = cast(value)
+        if value != value: # nan
+            raise ValueError
+    except (ValueError, OverflowError):
+        raise RequestError(400, f"{name} must be a number, got {value!r}") from None
+    return min(max(value, low), high)
+
+
+class PokeLookupRequestHandler(BaseHTTPRequestHandler):
+    """
+    GET  /pokemon?q=<name>                      pokemon, 404 if nothing matches
+    GET  /type-chart?q=<name>                   pokemon with its type chart
+    GET  /candidates?q=<name>&k=5&cutoff=0      best fuzzy matches with their scores, k is clamped to 1..MAX_CANDIDATES
+                                                and cutoff to 0..100
+    POST any of the above with {"queries": [...], "k": 5, "cutoff": 0} to look up a batch in one request,
+         results come back in query order with null for anything that didn't match
+    GET  /metrics?format=prometheus             lookup stage timings and counters as prometheus text or json (format=json),
+                                                empty unless instrumentation is enabled. Each worker process reports its own
+    """
+    protocol_version = "HTTP/1.1" # keep-alive, so clients can reuse a connection for many requests
+    disable_nagle_algorithm = True # headers and body are separate writes, without this each response waits on a delayed ack
+    timeout = IDLE_TIMEOUT # each connection holds a worker thread for as long as it's open, so idle ones can't be kept forever
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if url.path == "/metrics":
+            self._send_metrics(params.get("format", "prometheus"))
+            return
+        self._handle(url.path, [params.get("q")], params, batch=False)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        body_read = False
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            if length < 0:
+                raise RequestError(400, "Content-Length can't be negative")
+            if length > MAX_BODY_BYTES:
+                raise RequestError(413, f"request body is limited to {MAX_BODY_BYTES} bytes")
+            data = self.rfile.read(length)
+            body_read = True
+            body = json.loads(data or b"{}")
+            queries = body.get("queries") if isinstance(body, dict) else None
+            if not isinstance(queries, list) or not all(isinstance(q, str) for q in queries):
+                raise RequestError(400, "body must be a json object with a \"queries\" list of strings")
+            if len(queries) > MAX_BATCH_SIZE:
+                raise RequestError(413, f"batches are limited to {MAX_BATCH_SIZE} queries")
+        except (ValueError, RequestError) as e:
+            # an unread body would be taken for the next request on this keep-alive connection, so hang up instead
+            self._send_json(getattr(e, "status", 400), {"error": str(e)}, close=not body_read)
+            return
+        self._handle(url.path, queries, body, batch=True)
+
+    def _handle(self, path: str, queries: List[str], params: dict, batch: bool):
+        try:
+            if not batch and queries[0] is None:
+                raise RequestError(400, "missing query parameter q")
+
+            pokelookup: PokeLookup = self.server.pokelookup
+            if path in ("/pokemon", "/type-chart"):
+                include_type_chart = path == "/type-chart"
+                # single lookups go through find_pokemon's cache, batches are fuzzy matched in bulk.
+                # the server's own worker threads already keep the cores busy, so rapidfuzz sticks to one thread
+                found = pokelookup.match_many(queries, workers=1) if batch else [pokelookup.find_pokemon(queries[0])]
+                results = [None if p is None else p.to_dict(include_type_chart) for p in found]
+            elif path == "/candidates":
+                k = _number(params, "k", FUZZY_CANDIDATES, int, 1, MAX_CANDIDATES)
+                cutoff = _number(params, "cutoff", 0, float, 0, 100)
+                results = [[{"pokemon": p.to_dict(), "score": score} for p, score in pokelookup.find_candidates(q, k, cutoff)] for q in queries]
+            else:
+                raise RequestError(404, f"unknown endpoint {path}")
+        except RequestError as e:
+            self._send_json(e.status, {"error": str(e)})
+            return
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        if batch:
+            self._send_json(200, {"results": results})
+        elif results[0] is None:
+            self._send_json(404, {"error": f"no pokemon matches {queries[0]!r}"})
+        else:
+            self._send_json(200, results[0])
+
+    def _send_metrics(self, format: str):
+        if format == "json":
+            data, content_type = instrumentation.to_json().encode("utf-8"), "application/json"
+        elif format == "prometheus":
+            data, content_type = instrumentation.to_prometheus().encode("utf-8"), "text/plain; version=0.0.4"
+        else:
+            self._send_json(400, {"error": f"unknown metrics format {format!r}, use prometheus or json"})
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, status: int, body, close: bool = False):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if close:
+            self.send_header("Connection", "close") # also makes the handler hang up once this response is sent
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class PokeLookupServer(HTTPServer):
+    def __init__(self, address, pokelookup: PokeLookup, workers: int = DEFAULT_WORKERS, verbose: bool = False, bind_and_activate: bool = True):
+        """
+        HTTP server that hands each connection to a fixed pool of worker threads
+        Every worker shares the one PokeLookup, its indexes are read only once loaded and its cache is lock protected
+        A keep-alive connection holds its worker until it closes or sits idle for IDLE_TIMEOUT seconds, connections beyond
+        workers wait for a free one. server_close hangs up on every open connection so their workers can exit
+
+        Parameters:
+            address    (tuple):      (host, port) to listen on, port 0 picks a free port
+            pokelookup (PokeLookup): loaded pokedex to serve
+            workers    (int):        number of connections served at once
+            verbose    (bool):       log every request to stderr
+            bind_and_activate (bool): bind and listen straight away, pass False to serve an existing socket instead
+        """
+        super().__init__(address, PokeLookupRequestHandler, bind_and_activate)
+        self.pokelookup = pokelookup
+        self.verbose = verbose
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pokelookup-server")
+        self._connections = {} # open connection -> its future in executor
+        self._connections_lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        with self._connections_lock:
+            self._connections[request] = self.executor.submit(self._process_request_thread, request, client_address)
+
+    def _process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            with self._connections_lock:
+                self._connections.pop(request, None)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        with self._connections_lock:
+            connections = list(self._connections.items())
+        for request, future in connections:
+            if future.cancelled():
+                # never got a worker, nothing else will close it
+                self.shutdown_request(request)
+            else:
+                # wakes the worker blocked reading this connection, it then closes it and exits
+                try:
+                    request.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+
+def _serve_worker(listen_socket: socket.socket, shared_path: str, workers: int, verbose: bool):
+    """
+    Worker process for serve_processes. Attaches to the shared pokedex and serves connections from the inherited socket
+    """
+    pokelookup = SharedPokeLookup(shared_path)
+    server = PokeLookupServer(listen_socket.getsockname(), pokelookup, workers, verbose, bind_and_activate=False)
+    # swap the unbound socket the server made for itself for the inherited one
+    server.socket.close()
+    server.socket = listen_socket
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def serve_processes(pokelookup: PokeLookup, host: str, port: int, processes: int, workers: int, verbose: bool):
+    """
+    Serves from several forked worker processes that all accept connections on one listening socket
+    The pokedex is packed into a SharedPokedex once, so the workers share a single copy of it instead of each holding their own
+
+    Parameters:
+        pokelookup (PokeLookup): loaded pokedex to pack into shared memory, the workers only use the shared copy
+        processes  (int):        number of worker processes
+        workers    (int):        worker threads per process
+    """
+    shared = SharedPokedex.create(pokelookup)
+    count = len(pokelookup.pokedex)
+
+    # terminate the workers and remove the shared file on SIGTERM too, not just ctrl+c
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    listen_socket = socket.create_server((host, port))
+    # non blocking so a worker that loses the race for a connection goes back to waiting instead of blocking in accept
+    listen_socket.setblocking(False)
+
+    context = multiprocessing.get_context("fork")
+    procs = [context.Process(target=_serve_worker, args=(listen_socket, shared.path, workers, verbose), daemon=True) for _ in range(processes)]
+    for p in procs:
+        p.start()
+
+    address = listen_socket.getsockname()
+    print(f"Serving {count} pokemon from {processes} processes on http://{address[0]}:{address[1]}", flush=True)
+    try:
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for p in procs:
+            p.terminate()
+        listen_socket.close()
+        shared.close()
+        shared.unlink()
+
+
+################################################################################
+#  Function:  main                                                             #
+#  Purpose:   serve lookups over http                                          #
+################################################################################
+def main():
+    parser = argparse.ArgumentParser(description="Serve PokeLookup over HTTP")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="connections served at once (per process)")
+    parser.add_argument("--processes", type=int, default=1, help="worker processes sharing one copy of the pokedex, needs fork (linux)")
+    parser.add_argument("--json-path", default=POKEDEX_JSON_PATH)
+    parser.add_argument("--store-path", default=POKEDEX_STORE_PATH)
+    parser.add_argument("-g", "--generation", type=int, default=DEFAULT_GENERATION, choices=sorted(GENERATION_DEX_SIZES))
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    parser.add_argument("--metrics", action="store_true", help="time the lookup stages, served at /metrics")
+    args = parser.parse_args()
+
+    if args.metrics:
+        instrumentation.enable()
+
+    if args.processes > 1 and "fork" not in multiprocessing.get_all_start_methods():
+        parser.error("--processes needs the fork start method, which isn't available on this platform")
+
+    pokelookup = PokeLookup(json_path=args.json_path, store_path=args.store_path, generation=args.generation)
+    if args.processes > 1:
+        serve_processes(pokelookup, args.host, args.port, args.processes, args.workers, args.verbose)
+        return
+
+    server = PokeLookupServer((args.host, args.port), pokelookup, args.workers, args.verbose)
+    print(f"Serving {len(pokelookup.pokedex)} pokemon on http://{server.server_address[0]}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+################################################################################
+#  Script entry point                                                          #
+################################################################################
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+import os
+import math
+import mmap
+import struct
+import tempfile
+import numpy as np
+from typing import List
+from pokelookup_core import FIND_CACHE_SIZE, NO_TYPE_INDEX, NUM_TYPES, SUGGESTION_LIMIT, PokeType, Pokemon, PokeLookup, normalize_name, timed
+
+
+# shared pokedex files live in /dev/shm where there is one, so they're never written back to disk
+SHM_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+# shared pokedex layout: a header followed by the arrays from _layout, each 8 byte aligned
+#   header: magic, version, pokemon count, lookup key count, name width in bytes, highest pokedex number, generation
+SHM_MAGIC = b"PLSM"
+SHM_VERSION = 2
+SHM_HEADER = struct.Struct("<4sHIIIII")
+
+
+def _layout(count: int, key_count: int, name_width: int, max_id: int):
+    """
+    Works out where each array lives in the shared block
+
+    Returns:
+        Tuple[dict, int]: {array name: (offset, dtype, shape)} and the total size in bytes
+    """
+    fields = [
+        ("ids",         np.uint16,          (count,)),
+        ("type1",       np.uint8,           (count,)),
+        ("type2",       np.uint8,           (count,)),            # NO_TYPE_INDEX for single typed pokemon
+        ("names",       f"S{name_width}",   (count,)),            # in pokedex order
+        ("keys",        f"S{name_width}",   (key_count,)),        # every exact lookup key (names, hyphenless names and aliases), sorted
+        ("key_index",   np.uint16,          (key_count,)),        # pokedex index for each key
+        ("id_index",    np.int32,           (max_id + 1,)),       # pokedex index for each pokedex number, -1 if missing
+        ("type_charts", np.float64,         (count, NUM_TYPES)),  # same as PokeLookup.type_charts
+    ]
+    layout = {}
+    offset = SHM_HEADER.size
+    for name, dtype, shape in fields:
+        offset = (offset + 7) & ~7
+        dtype = np.dtype(dtype)
+        layout[name] = (offset, dtype, shape)
+        offset += dtype.itemsize * math.prod(shape)
+    return layout, offset
+
+
+class SharedPokedex:
+    def __init__(self, path: str, owner: bool):
+        """
+        Numpy views over a pokedex packed into a memory mapped file. Every process that maps the file shares the same
+        physical pages. Use SharedPokedex.create in the parent and SharedPokedex.attach in the workers rather than calling this directly
+
+        Raises:
+            ValueError: if the file doesn't hold a shared pokedex this version understands
+        """
+        self.path = path
+        self.owner = owner
+        with open(path, "r+b" if owner else "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE if owner else mmap.ACCESS_READ)
+
+        magic, version, count, key_count, name_width, max_id, generation = SHM_HEADER.unpack_from(self._mm)
+        if magic != SHM_MAGIC or version != SHM_VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} doesn't hold a version {SHM_VERSION} shared pokedex")
+        self.generation = generation
+
+        layout, _ = _layout(count, key_count, name_width, max_id)
+        self._arrays = {}
+        for name, (offset, dtype, shape) in layout.items():
+            self._arrays[name] = np.ndarray(shape, dtype=dtype, buffer=self._mm, offset=offset)
+
+    @property
+    def arrays(self) -> dict:
+        """
+        {array name: numpy view into the shared file}, see _layout
+
+        Raises:
+            ValueError: if this has been closed
+        """
+        if self._mm.closed:
+            raise ValueError(f"shared pokedex {self.path} is closed")
+        return self._arrays
+
+    @classmethod
+    def create(cls, pokelookup: PokeLookup, path: str = None) -> "SharedPokedex":
+        """
+        Packs a loaded pokedex and its lookup tables into a new shared file
+        The caller owns the file and should unlink() it once every worker is done with it
+
+        Parameters:
+            pokelookup (PokeLookup): loaded pokedex to share
+            path       (str):        where to put the file, defaults to a new file in SHM_DIR
+        """
+        pokedex = pokelookup.pokedex
+        keys = sorted((k.encode("utf-8"), i) for k, i in pokelookup._name_index.items())
+        names = [p.name.encode("utf-8") for p in pokedex]
+        name_width = max([len(k) for k, _ in keys] + [len(n) for n in names] + [1])
+        max_id = max([p.id for p in pokedex] + [0])
+
+        layout, size = _layout(len(pokedex), len(keys), name_width, max_id)
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="pokelookup-", suffix=".shm", dir=SHM_DIR)
+            os.close(fd)
+        with open(path, "wb") as f:
+            f.write(SHM_HEADER.pack(SHM_MAGIC, SHM_VERSION, len(pokedex), len(keys), name_width, max_id, pokelookup.generation))
+            f.truncate(size)
+
+        shared = cls(path, owner=True)
+        a = shared.arrays
+        a['ids'][:] = [p.id for p in pokedex]
+        a['type1'][:] = [p.type1.value for p in pokedex]
+        a['type2'][:] = [NO_TYPE_INDEX if p.type2 is None else p.type2.value for p in pokedex]
+        a['names'][:] = names
+        a['keys'][:] = [k for k, _ in keys]
+        a['key_index'][:] = [i for _, i in keys]
+        a['id_index'][:] = -1
+        a['id_index'][a['ids']] = np.arange(len(pokedex))
+        a['type_charts'][:] = pokelookup.type_charts
+        shared._mm.flush()
+        for array in a.values():
+            array.flags.writeable = False
+        return shared
+
+    @classmethod
+    def attach(cls, path: str) -> "SharedPokedex":
+        """
+        Maps a file made by SharedPokedex.create read only, nothing is copied
+        """
+        return cls(path, owner=False)
+
+    def close(self):
+        """
+        Unmaps the file. Every view from arrays has to be gone by then, mmap refuses to close with a BufferError otherwise
+        """
+        self._arrays = {}
+        self._mm.close()
+
+    def unlink(self):
+        """
+        Removes the file. Processes that already have it mapped keep working
+        """
+        os.unlink(self.path)
+
+
+class SharedPokedexView:
+    def __init__(self, shared: SharedPokedex):
+        """
+        Read only stand in for PokeLookup.pokedex that builds each Pokemon from the shared arrays the first time it's asked for
+        Built pokemon are kept, so like PokeLookup.pokedex each species is a single instance within a process
+        """
+        self.shared = shared
+        self._types = list(PokeType)
+        self._pokemon: List[Pokemon] = [None] * len(shared.arrays['ids'])
+
+    def __len__(self):
+        return len(self._pokemon)
+
+    def __getitem__(self, idx: int) -> Pokemon:
+        pokemon = self._pokemon[idx]
+        if pokemon is None:
+            a = self.shared.arrays
+            type2 = int(a['type2'][idx])
+            pokemon = Pokemon(int(a['ids'][idx]), a['names'][idx].decode("utf-8"), self._types[a['type1'][idx]],
+                              None if type2 == NO_TYPE_INDEX else self._types[type2], self.shared.generation)
+            self._pokemon[idx] = pokemon
+        return pokemon
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class SharedPrefixIndex:
+    def __init__(self, shared: SharedPokedex):
+        """
+        PrefixIndex over the sorted key array in shared memory
+        """
+        self.keys = shared.arrays['keys']
+        self.key_index = shared.arrays['key_index']
+
+    def search(self, prefix: str, limit: int = SUGGESTION_LIMIT) -> List[int]:
+        encoded = prefix.encode("utf-8")
+        lo = int(np.searchsorted(self.keys, encoded, side="left"))
+        hi = int(np.searchsorted(self.keys, encoded + b"\xff", side="left"))
+        matches = []
+        for i in self.key_index[lo:hi]:
+            i = int(i)
+            if i not in matches:
+                matches.append(i)
+                if len(matches) == limit:
+                    break
+        return matches
+
+
+class SharedPokeLookup(PokeLookup):
+    def __init__(self, shared_path: str, cache_size: int = FIND_CACHE_SIZE):
+        """
+        PokeLookup that runs off a SharedPokedex instead of loading its own copy of the pokedex, in the generation it was made for
+        Exact, id and prefix lookups read the shared arrays directly. The pre-processed names for fuzzy matching are the
+        only per process copy and are only built the first time a fuzzy match is needed
+
+        Parameters:
+            shared_path (str): path of the shared pokedex file made by SharedPokedex.create
+            cache_size  (int): number of find_pokemon results to keep in this process's LRU cache
+        """
+        self.shared_path = shared_path
+        self.shared = None
+        super().__init__(json_path=None, store_path=None, cache_size=cache_size)
+
+    def _load_pokedex(self) -> SharedPokedexView:
+        if self.shared is not None:
+            # reloading, the old views have to go before the old mapping can be closed
+            self._lazy_type_charts = None
+            self._lazy_prefix_index = None
+            self.shared.close()
+        self.shared = SharedPokedex.attach(self.shared_path)
+        self.generation = self.shared.generation
+        return SharedPokedexView(self.shared)
+
+    def _build_indexes(self):
+        a = self.shared.arrays
+        self._lazy_type_charts = a['type_charts']
+        self._lazy_prefix_index = None
+        self._lazy_fuzzy_names = None
+
+    @property
+    def _prefix_index(self) -> SharedPrefixIndex:
+        if self._lazy_prefix_index is None:
+            self._lazy_prefix_index = SharedPrefixIndex(self.shared)
+        return self._lazy_prefix_index
+
+    @property
+    def _fuzzy_names(self) -> List[str]:
+        if self._lazy_fuzzy_names is None:
+            from rapidfuzz import utils
+            self._lazy_fuzzy_names = [utils.default_process(n.decode("utf-8")) for n in self.shared.arrays['names']]
+        return self._lazy_fuzzy_names
+
+    @timed("exact")
+    def _find_exact(self, search_name: str) -> int:
+        a = self.shared.arrays
+        search_id = search_name.strip().lstrip("#")
+        if search_id.isdecimal():
+            id = int(search_id)
+            match = int(a['id_index'][id]) if id < len(a['id_index']) else -1
+            return None if match < 0 else match
+
+        name = normalize_name(search_name)
+        for key in (name, name.replace("-", "")):
+            encoded = key.encode("utf-8")
+            i = int(np.searchsorted(a['keys'], encoded))
+            if i < len(a['keys']) and a['keys'][i] == encoded:
+                return int(a['key_index'][i])
+        return None
+
+    def close(self):
+        """
+        Unmaps the shared pokedex. Lookups after this raise ValueError
+        The type charts and the prefix index are views into the mapping, so they're dropped first. A type_charts array
+        the caller is still holding on to keeps the mapping alive and makes this raise BufferError
+        """
+        self.invalidate_cache()
+        self._lazy_type_charts = None
+        self._lazy_prefix_index = None
+        self.shared.close()
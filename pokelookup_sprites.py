@@ -0,0 +1,130 @@
+import io
+import os
+import sys
+import mmap
+import struct
+from typing import Dict, Tuple
+
+
+BASE_IMAGE_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), "sprites")
+SPRITE_FOLDERS = ["pokemon", "types"]
+SPRITE_BUNDLE_PATH = os.path.join(BASE_IMAGE_PATH, "sprites.bundle")
+
+# sprite bundle layout (little endian):
+#   header:  magic, version, entry count
+#   entries: key (e.g., "pokemon/25" or "types/unknown"), offset from the start of the file, length. One per sprite
+#   data:    every sprite's png bytes, back to back in entry order
+BUNDLE_MAGIC = b"PLSB"
+BUNDLE_VERSION = 1
+BUNDLE_HEADER = struct.Struct("<4sHI")
+BUNDLE_ENTRY = struct.Struct("<24sQI")
+
+
+def sprite_key(folder: str, name: str) -> str:
+    """
+    Returns the bundle key for sprites/<folder>/<name>.png, e.g., sprite_key("pokemon", "25") -> "pokemon/25"
+    """
+    return f"{folder}/{name}"
+
+
+def build_sprite_bundle(sprite_dir: str = BASE_IMAGE_PATH, bundle_path: str = SPRITE_BUNDLE_PATH) -> int:
+    """
+    Packs every png under sprite_dir/pokemon and sprite_dir/types into a single indexed bundle file
+    The png bytes are copied as is, so each sprite is still compressed and only decoded when it's asked for
+
+    Parameters:
+        sprite_dir  (str): folder holding the pokemon and types sprite folders
+        bundle_path (str): where to write the bundle
+
+    Returns:
+        int: number of sprites packed
+    """
+    sprites = []
+    for folder in SPRITE_FOLDERS:
+        folder_path = os.path.join(sprite_dir, folder)
+        for file_name in sorted(os.listdir(folder_path)):
+            name, ext = os.path.splitext(file_name)
+            if ext.lower() != ".png":
+                continue
+            with open(os.path.join(folder_path, file_name), "rb") as f:
+                sprites.append((sprite_key(folder, name), f.read()))
+
+    offset = BUNDLE_HEADER.size + len(sprites) * BUNDLE_ENTRY.size
+    entries = bytearray(BUNDLE_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(sprites)))
+    for key, data in sprites:
+        entries += BUNDLE_ENTRY.pack(key.encode("ascii"), offset, len(data))
+        offset += len(data)
+
+    tmp_path = f"{bundle_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(entries)
+        for _, data in sprites:
+            f.write(data)
+    os.replace(tmp_path, bundle_path)
+    return len(sprites)
+
+
+class SpriteBundle:
+    def __init__(self, bundle_path: str = SPRITE_BUNDLE_PATH):
+        """
+        Memory maps a bundle written by build_sprite_bundle. Only the offset table is read up front,
+        sprite bytes are paged in from the mapping when a sprite is opened
+
+        Parameters:
+            bundle_path (str): path of the bundle file
+
+        Raises:
+            ValueError: if the file isn't a sprite bundle this version understands (including an empty or truncated one)
+        """
+        with open(bundle_path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # the whole bundle is only a few hundred KB, so ask the kernel to start reading all of it in one go
+        # rather than faulting it in a page at a time as sprites are opened
+        if hasattr(mmap, "MADV_WILLNEED"):
+            self._mm.madvise(mmap.MADV_WILLNEED)
+
+        magic, version, count = BUNDLE_HEADER.unpack_from(self._mm) if len(self._mm) >= BUNDLE_HEADER.size else (None, None, 0)
+        if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION or len(self._mm) < BUNDLE_HEADER.size + count * BUNDLE_ENTRY.size:
+            self._mm.close()
+            raise ValueError(f"{bundle_path} is not a version {BUNDLE_VERSION} sprite bundle")
+
+        self._index: Dict[str, Tuple[int, int]] = {}
+        for key, offset, length in struct.iter_unpack(BUNDLE_ENTRY.format, self._mm[BUNDLE_HEADER.size:BUNDLE_HEADER.size + count * BUNDLE_ENTRY.size]):
+            self._index[key.rstrip(b"\0").decode("ascii")] = (offset, length)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def open(self, key: str) -> io.BytesIO:
+        """
+        Returns the png bytes for key as a file like object, ready for PIL.Image.open
+
+        Raises:
+            KeyError: if key isn't in the bundle
+        """
+        offset, length = self._index[key]
+        return io.BytesIO(self._mm[offset:offset + length])
+
+    def close(self):
+        self._mm.close()
+
+
+################################################################################
+#  Function:  main                                                             #
+#  Purpose:   build the sprite bundle                                          #
+################################################################################
+def main():
+    sprite_dir = sys.argv[1] if len(sys.argv) > 1 else BASE_IMAGE_PATH
+    bundle_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(sprite_dir, os.path.basename(SPRITE_BUNDLE_PATH))
+    count = build_sprite_bundle(sprite_dir, bundle_path)
+    print(f"Packed {count} sprites into {bundle_path}")
+
+
+################################################################################
+#  Script entry point                                                          #
+################################################################################
+if __name__ == "__main__":
+    main()
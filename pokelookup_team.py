@@ -0,0 +1,126 @@
+import sys
+import numpy as np
+from typing import List, Tuple
+from pokelookup_core import DEFAULT_GENERATION, PokeType, Pokemon, PokeLookup, get_generation, get_type_charts
+
+
+TEAM_SIZE = 6
+IMMUNITY_SCORE = 3 # an immunity scores like a 1/8 resistance when ranking teammates
+
+
+class TeamAnalysis:
+    def __init__(self, team: List[Pokemon]):
+        """
+        Aggregates the type charts of every member of a team, in the team's generation
+
+        Parameters:
+            team (List[Pokemon]): the team to analyze, usually up to 6 pokemon from the same generation
+        """
+        self.team = team
+        self.generation = get_generation(team[0].generation if team else DEFAULT_GENERATION)
+        self.type_charts = get_type_charts(team) # (member, attack type)
+
+        # per attack type counts of how many team members are weak, resistant or immune to it
+        self.weaknesses = (self.type_charts > 1).sum(axis=0)
+        self.resistances = ((self.type_charts < 1) & (self.type_charts > 0)).sum(axis=0)
+        self.immunities = (self.type_charts == 0).sum(axis=0)
+
+
+    def get_net_weaknesses(self) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: per attack type, members weak to it minus members that resist or are immune to it
+        """
+        return self.weaknesses - self.resistances - self.immunities
+
+
+    def get_gaps(self) -> List[PokeType]:
+        """
+        Returns:
+            List[PokeType]: attack types more of the team is weak to than can take them, worst first
+        """
+        net = self.get_net_weaknesses()
+        return [PokeType(int(t)) for t in np.argsort(-net, kind="stable") if net[t] > 0]
+
+
+    def score_candidates(self, type_charts: np.ndarray) -> np.ndarray:
+        """
+        Scores how well each candidate covers this team's gaps
+
+        Every attack type a candidate resists adds to its score and every weakness takes away from it (2x is -1, 1/2 is +1,
+        4x is -2, 1/4 is +2 and immunities are +IMMUNITY_SCORE). Each attack type is weighted by 1 plus how many more
+        team members are weak to it than can take it, so covering the team's gaps counts the most
+
+        Parameters:
+            type_charts (np.ndarray): (candidate, attack type) shaped type charts, e.g., PokeLookup.type_charts
+
+        Returns:
+            np.ndarray: one score per candidate, higher is better
+        """
+        with np.errstate(divide="ignore"):
+            values = np.where(type_charts == 0, IMMUNITY_SCORE, -np.log2(type_charts))
+        weights = 1 + np.maximum(self.get_net_weaknesses(), 0)
+        return values @ weights
+
+
+    def find_best_teammates(self, pokelookup: PokeLookup, k: int = 1) -> List[Tuple[Pokemon, float]]:
+        """
+        Scores every pokemon in the pokedex against this team in one go and returns the best k that aren't already on it
+
+        Parameters:
+            pokelookup (PokeLookup): pokedex to pick candidates from
+            k          (int):        number of teammates to return
+
+        Returns:
+            List[Tuple[Pokemon, float]]: (pokemon, score) pairs, best first
+        """
+        scores = self.score_candidates(pokelookup.type_charts)
+        team_ids = {p.id for p in self.team}
+        best = []
+        for idx in np.argsort(-scores, kind="stable"):
+            if pokelookup.pokedex[idx].id in team_ids:
+                continue
+            best.append((pokelookup._build_pokemon(int(idx)), float(scores[idx])))
+            if len(best) == k:
+                break
+        return best
+
+
+    def __str__(self):
+        # Type       Weak  Resist  Immune
+        # Normal        0       1       2
+        report = f"{'Type':<10}{'Weak':>6}{'Resist':>8}{'Immune':>8}\n"
+        for t in self.generation.types:
+            report = report + f"{t.name.title():<10}{self.weaknesses[t.value]:>6}{self.resistances[t.value]:>8}{self.immunities[t.value]:>8}\n"
+        return report
+
+
+################################################################################
+#  Function:  main                                                             #
+#  Purpose:   analyze the team given on the command line                       #
+################################################################################
+def main():
+    if len(sys.argv) < 2:
+        print(f"usage: {sys.argv[0]} <pokemon> [<pokemon> ...]")
+        sys.exit(1)
+
+    pokelookup = PokeLookup()
+    team = [pokelookup.find_pokemon(name) for name in sys.argv[1:TEAM_SIZE + 1]]
+    team = [p for p in team if p is not None]
+
+    analysis = TeamAnalysis(team)
+    print(" | ".join(p.name.title() for p in team))
+    print(analysis)
+
+    gaps = analysis.get_gaps()
+    print(f"Gaps: {', '.join(t.name.title() for t in gaps) if gaps else 'none'}")
+    if len(team) < TEAM_SIZE:
+        for p, score in analysis.find_best_teammates(pokelookup, k=3):
+            print(f"Suggested teammate: #{p.id:03} {p.name.title()} ({score:g})")
+
+
+################################################################################
+#  Script entry point                                                          #
+################################################################################
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import os
+import json
+import random
+import hashlib
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Dict, List
+from pokelookup_core import GENERATION_DEX_SIZES, LATEST_GENERATION, PokeLookup
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+# synthetic pokedex data and a stub api for the tests and benchmarks, nothing in the app uses this module
+
+# the 17 gen 3 type names in PokeType order
+TYPE_NAMES = ["normal", "fighting", "flying", "poison", "ground", "rock", "bug", "ghost", "steel",
+              "fire", "water", "grass", "electric", "psychic", "ice", "dragon", "dark"]
+VERSION_GROUPS = ["red-blue", "yellow", "gold-silver", "crystal", "ruby-sapphire", "emerald", "firered-leafgreen",
+                  "diamond-pearl", "platinum", "heartgold-soulsilver", "black-white", "black-2-white-2"]
+
+
+def make_pokemon(id: int, moves: int = 60) -> dict:
+    """
+    Builds a fake pokemon record shaped like a PokeAPI /pokemon/{id} response
+    The record is padded out with moves, game indices and sprite urls so parsing it costs roughly what the real payload does
+
+    Parameters:
+        id    (int): pokedex number, also seeds the rng so the same id always produces the same record
+        moves (int): number of moves to attach to the record
+
+    Returns:
+        dict: the fake pokemon record
+    """
+    rng = random.Random(id)
+    types = [{"slot": 1, "type": {"name": rng.choice(TYPE_NAMES), "url": "https://pokeapi.co/api/v2/type/1/"}}]
+    if rng.random() < 0.5:
+        types.append({"slot": 2, "type": {"name": rng.choice(TYPE_NAMES), "url": "https://pokeapi.co/api/v2/type/2/"}})
+
+    # roughly 1 in 20 pokemon changed types in gen 6
+    past_types = []
+    if rng.random() < 0.05:
+        past_types.append({"generation": {"name": "generation-v", "url": "https://pokeapi.co/api/v2/generation/5/"},
+                           "types": [{"slot": 1, "type": {"name": "normal", "url": "https://pokeapi.co/api/v2/type/1/"}}]})
+
+    return {
+        "id": id,
+        "name": f"synthmon-{id}",
+        "types": types,
+        "past_types": past_types,
+        "moves": [{
+            "move": {"name": f"move-{rng.randrange(800)}", "url": f"https://pokeapi.co/api/v2/move/{rng.randrange(800)}/"},
+            "version_group_details": [{
+                "level_learned_at": rng.randrange(100),
+                "move_learn_method": {"name": "level-up", "url": "https://pokeapi.co/api/v2/move-learn-method/1/"},
+                "version_group": {"name": vg, "url": "https://pokeapi.co/api/v2/version-group/1/"},
+            } for vg in rng.sample(VERSION_GROUPS, 6)],
+        } for _ in range(moves)],
+        "game_indices": [{"game_index": id, "version": {"name": vg, "url": "https://pokeapi.co/api/v2/version/1/"}} for vg in VERSION_GROUPS],
+        "sprites": {key: f"https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/{key}/{id}.png"
+                    for key in ["front_default", "back_default", "front_shiny", "back_shiny", "front_female", "back_female"]},
+    }
+
+
+def make_pokedex(count: int = 386, moves: int = 60) -> List[dict]:
+    """
+    Builds a list of count fake pokemon records, ids 1 to count
+    """
+    return [make_pokemon(id, moves) for id in range(1, count + 1)]
+
+
+def generation_for(count: int) -> int:
+    """
+    Returns the first generation whose dex holds count pokemon, so PokeLookup loads all of a fake pokedex of that size
+    Anything past the national dex only loads its first GENERATION_DEX_SIZES[LATEST_GENERATION] pokemon
+    """
+    return next((g for g, size in sorted(GENERATION_DEX_SIZES.items()) if size >= count), LATEST_GENERATION)
+
+
+def write_pokedex(path: str, count: int = 386, moves: int = 60):
+    """
+    Writes a fake pokedex to path in the same format as PokeLookup._download_pokemon_data
+    """
+    with open(path, "w") as f:
+        json.dump(make_pokedex(count, moves), f)
+
+
+def make_sprite(rng: random.Random, size) -> "Image.Image":
+    """
+    Draws a placeholder sprite similar to the real ones, a handful of flat colored shapes on a transparent background
+    """
+    from PIL import Image, ImageDraw
+    image = Image.new("P", size, 0)
+    image.putpalette([rng.randrange(256) for _ in range(16 * 3)])
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        r = rng.randrange(4, min(size) // 4)
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=rng.randrange(1, 16))
+    return image
+
+
+def write_sprites(sprite_dir: str, count: int):
+    """
+    Writes placeholder sprites in the same layout as the real sprites folder
+    sprite_dir should be a new temporary folder, never the app's own sprites folder
+    """
+    rng = random.Random(0)
+    os.makedirs(os.path.join(sprite_dir, "pokemon"))
+    os.makedirs(os.path.join(sprite_dir, "types"))
+    for id in range(0, count + 1):
+        make_sprite(rng, (96, 96)).save(os.path.join(sprite_dir, "pokemon", f"{id}.png"), transparency=0)
+    for name in [str(i) for i in range(17)] + ["none", "unknown"]:
+        make_sprite(rng, (144, 32)).save(os.path.join(sprite_dir, "types", f"{name}.png"), transparency=0)
+
+
+class StubPokeAPI:
+    def __init__(self, records: Dict[int, dict], conditional: bool = True):
+        """
+        Local stand in for pokeapi's /pokemon/{id} endpoint, serving records from memory on a free port
+        Each record gets an ETag from its content and a Last-Modified from when it was last set, and a request whose
+        If-None-Match still matches gets an empty 304. With conditional off it ignores both and always sends the record
+
+        Parameters:
+            records     (Dict[int, dict]): pokemon records keyed by pokedex number
+            conditional (bool):            send validators and answer conditional requests with 304s
+        """
+        self.conditional = conditional
+        self.statuses: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._records = {}
+        for id, record in records.items():
+            self.set_record(id, record)
+
+        stub = self
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                id = self.path.rstrip("/").rsplit("/", 1)[-1]
+                entry = stub._records.get(int(id)) if id.isdecimal() else None
+                if entry is None:
+                    stub._respond(self, 404, b"")
+                elif stub.conditional and self.headers.get("If-None-Match") == entry["etag"]:
+                    stub._respond(self, 304, b"", entry)
+                else:
+                    stub._respond(self, 200, entry["body"], entry)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/api/v2"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def set_record(self, id: int, record: dict):
+        body = json.dumps(record).encode("utf-8")
+        self._records[id] = {"body": body, "etag": f'"{hashlib.sha256(body).hexdigest()[:16]}"', "last_modified": formatdate(usegmt=True)}
+
+    def remove_record(self, id: int):
+        """
+        Stops serving a record, requests for it get a 404 until it's set again
+        """
+        self._records.pop(id, None)
+
+    def _respond(self, handler: BaseHTTPRequestHandler, status: int, body: bytes, entry: dict = None):
+        with self._lock:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+        handler.send_response(status)
+        if entry is not None and self.conditional:
+            handler.send_header("ETag", entry["etag"])
+            handler.send_header("Last-Modified", entry["last_modified"])
+        if status != 304:
+            handler.send_header("Content-Type", "application/json")
+            handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        if status != 304:
+            handler.wfile.write(body)
+
+    def reset_statuses(self):
+        with self._lock:
+            self.statuses = {}
+
+    def __enter__(self) -> "StubPokeAPI":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def mutate(record: dict, rename: bool) -> dict:
+    """
+    Returns a copy of record that's changed the way a real update might change it, swapped types and optionally a new name
+    """
+    record = json.loads(json.dumps(record))
+    types = record['types']
+    record['types'] = [{"slot": 1, "type": {"name": "fire" if types[0]['type']['name'] != "fire" else "water", "url": ""}}]
+    if rename:
+        record['name'] = f"{record['name']}-renamed"
+    return record
+
+
+def check_matches_fresh_load(pokelookup: PokeLookup, queries: List[str]) -> List[str]:
+    """
+    Compares a refreshed PokeLookup against one freshly loaded from the same files
+    """
+    fresh = PokeLookup(json_path=pokelookup.json_path, store_path=pokelookup.store_path, generation=pokelookup.generation)
+    failures = []
+    if list(pokelookup.pokedex) != list(fresh.pokedex):
+        failures.append("refreshed pokedex differs from a fresh load")
+    for q in queries:
+        if pokelookup.find_pokemon(q) != fresh.find_pokemon(q):
+            failures.append(f"find_pokemon({q!r}) differs from a fresh load")
+        if pokelookup.suggest(q) != fresh.suggest(q):
+            failures.append(f"suggest({q!r}) differs from a fresh load")
+    if (pokelookup.type_charts != fresh.type_charts).any():
+        failures.append("refreshed type_charts differ from a fresh load")
+    return failures
@@ -0,0 +1,29 @@
+import os
+import sys
+import types
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, ROOT)
+from pokelookup_testing import StubPokeAPI, make_pokemon
+from support import DEX_SIZE, MOVES
+
+
+@pytest.fixture
+def records() -> dict:
+    return {id: make_pokemon(id, MOVES) for id in range(1, DEX_SIZE + 1)}
+
+
+@pytest.fixture
+def stub(records) -> StubPokeAPI:
+    with StubPokeAPI(records) as stub:
+        yield stub
+
+
+@pytest.fixture
+def paths(tmp_path) -> types.SimpleNamespace:
+    """
+    Where a test's pokemon.json, compact store and checkpoint cache go
+    """
+    return types.SimpleNamespace(json_path=str(tmp_path / "pokemon.json"), store_path=str(tmp_path / "pokemon.bin"),
+                                 cache_dir=str(tmp_path / "pokemon_cache"))
@@ -0,0 +1,16 @@
+from pokelookup_testing import StubPokeAPI
+from pokelookup_core import PokeLookup
+
+# generation 1 keeps a full download small, and a handful of moves keeps each record small
+DEX_SIZE = 151
+GENERATION = 1
+MOVES = 2
+
+
+def download(paths, stub: StubPokeAPI):
+    """
+    Downloads the stub's pokedex into paths without retries, so a missing record fails straight away
+    """
+    pokelookup = PokeLookup(json_path=paths.json_path, store_path=paths.store_path, load=False, generation=GENERATION)
+    pokelookup._download_pokemon_data(base_url=stub.base_url, workers=4, retries=0, backoff=0, cache_dir=paths.cache_dir,
+                                      output_path=paths.json_path)
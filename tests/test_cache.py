@@ -0,0 +1,70 @@
+import json
+from support import DEX_SIZE, GENERATION
+from pokelookup_testing import make_pokedex
+from pokelookup_core import LRUCache, PokeLookup
+
+
+def test_least_recently_used_is_evicted_first():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1 # a is now the most recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    cache.put("a", 4) # updating counts as a use too
+    cache.put("d", 5)
+    assert cache.get("c", "gone") == "gone"
+    assert (cache.get("a"), cache.get("d")) == (4, 5)
+
+
+def test_counters():
+    cache = LRUCache(2)
+    cache.get("a")
+    cache.put("a", None) # a cached None is still a hit
+    assert cache.get("a", "missing") is None
+    cache.put("b", 2)
+    cache.put("c", 3)
+    cache.get("b")
+    assert cache.get_stats() == {"hits": 2, "misses": 1, "evictions": 1, "size": 2, "maxsize": 2}
+
+    # clearing and discarding drop entries but keep the counters
+    assert cache.discard_if(lambda value: value == 2) == 1
+    cache.clear()
+    assert cache.get_stats() == {"hits": 2, "misses": 1, "evictions": 1, "size": 0, "maxsize": 2}
+
+
+def test_maxsize_0_caches_nothing():
+    cache = LRUCache(0)
+    cache.put("a", 1)
+    assert cache.get("a") is None
+    assert cache.get_stats() == {"hits": 0, "misses": 1, "evictions": 0, "size": 0, "maxsize": 0}
+
+
+def test_find_pokemon_cache(paths):
+    records = make_pokedex(DEX_SIZE, moves=0)
+    with open(paths.json_path, "w") as f:
+        json.dump(records, f)
+    pokelookup = PokeLookup(json_path=paths.json_path, store_path=paths.store_path, cache_size=4, generation=GENERATION)
+
+    first = pokelookup.find_pokemon("#5")
+    assert pokelookup.find_pokemon("#5") is first
+    assert pokelookup.find_pokemon(" #5 ") is first # same key once normalized
+    pokelookup.find_pokemon("no such pokemon")
+    assert pokelookup.get_cache_stats() == {"hits": 2, "misses": 2, "evictions": 0, "size": 2, "maxsize": 4}
+
+    pokelookup.invalidate_cache()
+    assert pokelookup.get_cache_stats()["size"] == 0
+    assert pokelookup.find_pokemon("#5") is first # the pokedex didn't change, only the cache did
+
+    # a reload must not hand back results cached from the old pokedex
+    records[4]["name"] = "renamed"
+    with open(paths.json_path, "w") as f:
+        json.dump(records, f)
+    pokelookup.reload()
+    assert pokelookup.get_cache_stats()["size"] == 0
+    assert pokelookup.find_pokemon("#5").name == "renamed"
+
+    uncached = PokeLookup(json_path=paths.json_path, store_path=paths.store_path, cache_size=0, generation=GENERATION)
+    assert uncached.find_pokemon("#5") is uncached.find_pokemon("#5") # still one instance per species
+    assert uncached.get_cache_stats()["size"] == 0
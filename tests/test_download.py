@@ -0,0 +1,51 @@
+import os
+import pytest
+from support import DEX_SIZE, GENERATION, download
+from pokelookup_core import DownloadError, PokeLookup
+
+
+def test_failed_fetch_keeps_the_rest(paths, stub, records):
+    stub.remove_record(3)
+    with pytest.raises(DownloadError) as e:
+        download(paths, stub)
+    assert list(e.value.failures) == [3]
+    assert not os.path.exists(paths.json_path)
+
+    # everything but the failure was checkpointed and is in the manifest
+    pokelookup = PokeLookup(load=False, generation=GENERATION)
+    manifest = pokelookup._read_manifest(paths.cache_dir)
+    assert sorted(manifest) == [id for id in range(1, DEX_SIZE + 1) if id != 3]
+    assert pokelookup._read_checkpoint(paths.cache_dir, 3) is None
+    assert all(pokelookup._read_checkpoint(paths.cache_dir, id) == records[id] for id in manifest)
+
+    # resuming only asks for what's missing
+    stub.set_record(3, records[3])
+    stub.reset_statuses()
+    download(paths, stub)
+    assert stub.statuses == {200: 1}
+    loaded = PokeLookup(json_path=paths.json_path, store_path=paths.store_path, generation=GENERATION)
+    assert [p.name for p in loaded.pokedex] == [records[id]["name"] for id in range(1, DEX_SIZE + 1)]
+
+
+def test_interrupted_download_keeps_completed_records(paths, stub, monkeypatch):
+    write_checkpoint = PokeLookup._write_checkpoint
+    written = []
+
+    def interrupt_once(self, cache_dir, id, record):
+        if len(written) == 10 and not hasattr(interrupt_once, "raised"):
+            interrupt_once.raised = True
+            raise KeyboardInterrupt
+        write_checkpoint(self, cache_dir, id, record)
+        written.append(id)
+
+    monkeypatch.setattr(PokeLookup, "_write_checkpoint", interrupt_once)
+    with pytest.raises(KeyboardInterrupt):
+        download(paths, stub)
+    # what finished after the interrupt was still checkpointed, only unstarted requests were dropped
+    assert len(written) > 10
+    assert sorted(PokeLookup(load=False)._read_manifest(paths.cache_dir)) == sorted(written)
+
+    checkpointed = len(written)
+    stub.reset_statuses()
+    download(paths, stub)
+    assert stub.statuses == {200: DEX_SIZE - checkpointed}
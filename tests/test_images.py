@@ -0,0 +1,26 @@
+import logging
+import pytest
+from pokelookup_testing import write_sprites
+from pokelookup_images import ImageCache
+from pokelookup_sprites import BUNDLE_HEADER, BUNDLE_MAGIC, build_sprite_bundle
+
+
+def old_version(data: bytes) -> bytes:
+    return BUNDLE_HEADER.pack(BUNDLE_MAGIC, 0, BUNDLE_HEADER.unpack_from(data)[2]) + data[BUNDLE_HEADER.size:]
+
+
+@pytest.mark.parametrize("corrupt", [old_version, lambda data: data[:BUNDLE_HEADER.size + 10], lambda data: b"not a bundle", lambda data: b""],
+                         ids=["old version", "truncated", "garbage", "empty"])
+def test_bad_bundle_falls_back_to_loose_sprites(tmp_path, caplog, corrupt):
+    sprite_dir = str(tmp_path / "sprites")
+    bundle_path = tmp_path / "sprites.bundle"
+    write_sprites(sprite_dir, 3)
+    build_sprite_bundle(sprite_dir, str(bundle_path))
+    bundle_path.write_bytes(corrupt(bundle_path.read_bytes()))
+
+    with caplog.at_level(logging.WARNING, logger="pokelookup_images"):
+        cache = ImageCache(sprite_dir=sprite_dir, bundle_path=str(bundle_path))
+    assert cache.bundle is None
+    assert "Ignoring sprite bundle" in caplog.text
+    assert cache._load_image("pokemon", "2").size == (96, 96)
+    assert cache._load_image("types", "unknown").size == (144, 32)
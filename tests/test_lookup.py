@@ -0,0 +1,40 @@
+import pytest
+from support import DEX_SIZE, GENERATION
+from pokelookup_testing import write_pokedex
+from pokelookup_core import PokeLookup
+from pokelookup_shm import SharedPokedex, SharedPokeLookup
+
+
+@pytest.fixture(scope="module")
+def pokelookup(tmp_path_factory) -> PokeLookup:
+    folder = tmp_path_factory.mktemp("lookup")
+    json_path = str(folder / "pokemon.json")
+    write_pokedex(json_path, DEX_SIZE, moves=2)
+    return PokeLookup(json_path=json_path, store_path=str(folder / "pokemon.bin"), generation=GENERATION)
+
+
+@pytest.fixture(scope="module")
+def shared_lookup(pokelookup, tmp_path_factory):
+    shared = SharedPokedex.create(pokelookup, str(tmp_path_factory.mktemp("shm") / "pokedex.shm"))
+    lookup = SharedPokeLookup(shared.path)
+    yield lookup
+    lookup.close()
+    shared.close()
+
+
+@pytest.mark.parametrize("lookup", ["pokelookup", "shared_lookup"])
+def test_pokedex_numbers(request, lookup):
+    lookup = request.getfixturevalue(lookup)
+    assert lookup.find_pokemon("25").id == 25
+    assert lookup.find_pokemon(" #025 ").id == 25
+    assert [p.id for p in lookup.suggest("#7")] == [7]
+    assert lookup.suggest(str(DEX_SIZE + 1)) == []
+
+
+@pytest.mark.parametrize("lookup", ["pokelookup", "shared_lookup"])
+@pytest.mark.parametrize("query", ["²", "#²", "3²", "Ⅻ"])
+def test_digit_like_characters_are_names(request, lookup, query):
+    # these are str.isdigit() (or numeric) but not numbers int() accepts, they're fuzzy matched like any other name
+    lookup = request.getfixturevalue(lookup)
+    lookup.find_pokemon(query)
+    assert isinstance(lookup.suggest(query), list)
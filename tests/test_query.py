@@ -0,0 +1,65 @@
+import random
+import numpy as np
+import pytest
+from pokelookup_testing import write_pokedex
+from pokelookup_core import GENERATION_DEX_SIZES, PokeLookup, PokeType
+from pokelookup_query import RELATIONS, TypeIndex, parse_condition
+
+
+@pytest.fixture(scope="module", params=[1, 3, 6], ids=lambda g: f"gen{g}")
+def index(request, tmp_path_factory) -> TypeIndex:
+    folder = tmp_path_factory.mktemp(f"query{request.param}")
+    json_path = str(folder / "pokemon.json")
+    write_pokedex(json_path, GENERATION_DEX_SIZES[request.param], moves=0)
+    return TypeIndex(PokeLookup(json_path=json_path, store_path=str(folder / "pokemon.bin"), generation=request.param))
+
+
+def brute_force(type_charts: np.ndarray, all_of, any_of, none_of) -> np.ndarray:
+    """
+    The same query as a plain filter over every pokemon's type chart
+    """
+    def holds(condition):
+        relation, attack_type = condition
+        return np.isin(type_charts[:, attack_type.value], RELATIONS[relation])
+
+    mask = np.ones(len(type_charts), dtype=bool)
+    for condition in all_of:
+        mask &= holds(condition)
+    if any_of:
+        mask &= np.any([holds(condition) for condition in any_of], axis=0)
+    for condition in none_of:
+        mask &= ~holds(condition)
+    return np.flatnonzero(mask)
+
+
+def test_select_matches_a_brute_force_filter(index):
+    rng = random.Random(index.generation.number)
+    conditions = [(relation, t) for relation in RELATIONS for t in index.generation.types]
+    for _ in range(300):
+        all_of, any_of, none_of = (rng.sample(conditions, rng.randrange(3)) for _ in range(3))
+        expected = brute_force(index.pokelookup.type_charts, all_of, any_of, none_of)
+        assert index.select(all_of, any_of, none_of).tolist() == expected.tolist(), (all_of, any_of, none_of)
+
+
+def test_find_returns_the_selected_pokemon(index):
+    condition = ("weak", index.generation.types[0])
+    selected = index.select([condition])
+    assert [p.id for p in index.find([condition])] == [index.pokelookup.pokedex[int(i)].id for i in selected]
+    assert all(p.get_type_effectiveness(condition[1]) in RELATIONS["weak"] for p in index.find([condition]))
+
+
+def test_types_outside_the_generation_are_rejected(index):
+    for t in set(PokeType) - set(index.generation.types):
+        with pytest.raises(ValueError, match=f"generation {index.generation.number}"):
+            index.select([("weak", t)])
+
+
+def test_parse_condition():
+    assert parse_condition("immune:ground") == ("immune", PokeType.GROUND)
+    assert parse_condition("4X:Ice") == ("4x", PokeType.ICE)
+
+
+@pytest.mark.parametrize("text", ["immune", "immune:", ":ground", "immune:lava", "hates:fire", "weak:fire:water", ""])
+def test_parse_condition_rejects_bad_input(text):
+    with pytest.raises(ValueError):
+        parse_condition(text)
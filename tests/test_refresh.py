@@ -0,0 +1,51 @@
+import pytest
+from support import DEX_SIZE, GENERATION, download
+from pokelookup_testing import check_matches_fresh_load, mutate
+from pokelookup_core import DownloadError, PokeLookup
+
+QUERIES = ["synthmon-1", "synthmon-10-renamed", "synthmon-100", "synthmn-7", "#50"]
+
+
+@pytest.fixture
+def pokelookup(paths, stub) -> PokeLookup:
+    download(paths, stub)
+    return PokeLookup(json_path=paths.json_path, store_path=paths.store_path, generation=GENERATION)
+
+
+def test_failed_fetch_still_applies_the_changes_that_arrived(paths, stub, records, pokelookup):
+    stub.set_record(10, mutate(records[10], rename=True))
+    stub.set_record(100, mutate(records[100], rename=False))
+    stub.remove_record(50)
+    with pytest.raises(DownloadError) as e:
+        pokelookup.refresh(base_url=stub.base_url, workers=4, cache_dir=paths.cache_dir)
+    assert list(e.value.failures) == [50]
+    assert sorted(e.value.changed) == [10, 100]
+
+    # the changes are in the files and in the live pokedex
+    assert pokelookup.find_pokemon("synthmon-10-renamed").id == 10
+    assert check_matches_fresh_load(pokelookup, QUERIES) == []
+
+    # so the next refresh has nothing left to do
+    stub.set_record(50, records[50])
+    stub.reset_statuses()
+    assert pokelookup.refresh(base_url=stub.base_url, workers=4, cache_dir=paths.cache_dir) == []
+    assert stub.statuses == {304: DEX_SIZE}
+
+
+def test_failed_write_leaves_the_manifest_behind(paths, stub, records, pokelookup, monkeypatch):
+    stub.set_record(10, mutate(records[10], rename=True))
+    stub.set_record(100, mutate(records[100], rename=False))
+    manifest = pokelookup._read_manifest(paths.cache_dir)
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(PokeLookup, "_patch_compact_store", fail)
+    with pytest.raises(OSError):
+        pokelookup.refresh(base_url=stub.base_url, workers=4, cache_dir=paths.cache_dir)
+    assert pokelookup._read_manifest(paths.cache_dir) == manifest
+
+    # the changes weren't lost, the next refresh fetches and writes them
+    monkeypatch.undo()
+    assert pokelookup.refresh(base_url=stub.base_url, workers=4, cache_dir=paths.cache_dir) == [10, 100]
+    assert check_matches_fresh_load(pokelookup, QUERIES) == []
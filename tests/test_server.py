@@ -0,0 +1,96 @@
+import json
+import time
+import socket
+import threading
+import http.client
+import pytest
+from support import DEX_SIZE, GENERATION
+from pokelookup_testing import write_pokedex
+from pokelookup_core import PokeLookup
+from pokelookup_server import MAX_CANDIDATES, PokeLookupRequestHandler, PokeLookupServer
+
+
+@pytest.fixture(scope="module")
+def pokelookup(tmp_path_factory) -> PokeLookup:
+    folder = tmp_path_factory.mktemp("server")
+    json_path = str(folder / "pokemon.json")
+    write_pokedex(json_path, DEX_SIZE, moves=2)
+    return PokeLookup(json_path=json_path, store_path=str(folder / "pokemon.bin"), generation=GENERATION)
+
+
+def start_server(pokelookup, workers: int) -> PokeLookupServer:
+    server = PokeLookupServer(("127.0.0.1", 0), pokelookup, workers=workers)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture(scope="module")
+def server(pokelookup):
+    server = start_server(pokelookup, 2)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def request(server, method, path, body=None, headers=None):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=5)
+    connection.request(method, path, body=body, headers=headers or {})
+    response = connection.getresponse()
+    result = response.status, json.loads(response.read()), response.getheader("Connection")
+    connection.close()
+    return result
+
+
+@pytest.mark.parametrize("k, expected", [("3", 3), ("-1", 1), ("0", 1), (str(MAX_CANDIDATES * 10), MAX_CANDIDATES)])
+def test_k_is_clamped(server, k, expected):
+    status, body, _ = request(server, "GET", f"/candidates?q=synthmon&k={k}")
+    assert status == 200
+    assert len(body) == expected
+
+
+@pytest.mark.parametrize("params", [{"k": [1]}, {"k": "many"}, {"k": True}, {"cutoff": {}}, {"cutoff": "nan"}])
+def test_bad_numbers_are_rejected(server, params):
+    status, body, _ = request(server, "POST", "/candidates", json.dumps(dict(params, queries=["synthmon-1"])))
+    assert status == 400
+    assert "must be a number" in body["error"]
+
+
+def test_unread_bodies_close_the_connection(server):
+    status, _, connection = request(server, "POST", "/pokemon", b"{}", {"Content-Length": "-1"})
+    assert (status, connection) == (400, "close")
+    status, _, connection = request(server, "POST", "/pokemon", b"x", {"Content-Length": str(10 * 1024 * 1024)})
+    assert (status, connection) == (413, "close")
+
+
+def test_idle_connections_are_dropped(pokelookup, monkeypatch):
+    monkeypatch.setattr(PokeLookupRequestHandler, "timeout", 0.5)
+    server = start_server(pokelookup, 2)
+    try:
+        # two idle keep-alive connections take both workers, the third request gets one once they time out
+        idle = [socket.create_connection(server.server_address) for _ in range(2)]
+        time.sleep(0.1)
+        status, body, _ = request(server, "GET", "/pokemon?q=25")
+        assert (status, body["id"]) == (200, 25)
+        assert all(s.recv(1) == b"" for s in idle)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_server_close_hangs_up_on_open_connections(pokelookup):
+    server = start_server(pokelookup, 1)
+    idle = [socket.create_connection(server.server_address) for _ in range(2)] # one with the worker and one waiting for it
+    time.sleep(0.1)
+    server.shutdown()
+    server.server_close()
+    for s in idle:
+        s.settimeout(5)
+        assert s.recv(1) == b""
+    for thread in list(server.executor._threads):
+        thread.join(5)
+        assert not thread.is_alive()
+
+
+def test_digit_like_query_is_not_a_bad_request(server):
+    status, _, _ = request(server, "GET", "/pokemon?q=%C2%B2") # "²"
+    assert status in (200, 404)
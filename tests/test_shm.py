@@ -0,0 +1,38 @@
+import pytest
+from support import DEX_SIZE, GENERATION
+from pokelookup_testing import write_pokedex
+from pokelookup_core import PokeLookup
+from pokelookup_shm import SharedPokedex, SharedPokeLookup
+
+
+@pytest.fixture
+def shared(tmp_path):
+    json_path = str(tmp_path / "pokemon.json")
+    write_pokedex(json_path, DEX_SIZE, moves=2)
+    pokelookup = PokeLookup(json_path=json_path, store_path=str(tmp_path / "pokemon.bin"), generation=GENERATION)
+    shared = SharedPokedex.create(pokelookup, str(tmp_path / "pokedex.shm"))
+    yield shared
+    shared.close()
+
+
+def test_close_invalidates_the_lookup(shared):
+    lookup = SharedPokeLookup(shared.path)
+    assert lookup.find_pokemon("synthmon-25").id == 25
+    assert lookup.suggest("synthmon-2")
+    assert lookup.find_candidates("synthmn-7", 1)
+    assert lookup.type_charts.shape[0] == DEX_SIZE
+
+    # the type charts and prefix index point into the mapping, closing mustn't trip over them
+    lookup.close()
+    for call in (lambda: lookup.find_pokemon("synthmon-1"), lambda: lookup.suggest("synthmon-1"), lambda: lookup.type_charts):
+        with pytest.raises(ValueError, match="closed"):
+            call()
+
+
+def test_reload_remaps(shared):
+    lookup = SharedPokeLookup(shared.path)
+    lookup.type_charts
+    lookup.suggest("synthmon-2")
+    lookup.reload()
+    assert lookup.find_pokemon("#25").name == "synthmon-25"
+    lookup.close()
@@ -0,0 +1,105 @@
+import pytest
+from pokelookup_core import NUM_TYPES, Pokemon, PokeLookup, PokeType, get_generation, get_type_charts
+
+
+# the 17x17 gen 2-5 chart as the lookup first shipped it, before charts were built per generation
+OLD_TYPE_CHART = [
+    # Attack type in rows, Defender type in columns
+    #                                                           Defending Type
+    # Normal    Fighting    Flying  Poison  Ground  Rock    Bug     Ghost   Steel   Fire    Water   Grass   Electric    Psychic Ice     Dragon  Dark
+    # Normal
+    [ 1,        1,          1,      1,      1,      0.5,    1,      0,      0.5,    1,      1,      1,      1,          1,      1,      1,      1   ],
+    # Fighting
+    [ 2,        1,          0.5,    0.5,    1,      2,      0.5,    0,      2,      1,      1,      1,      1,          0.5,    2,      1,      2   ],
+    # Flying
+    [ 1,        2,          1,      1,      1,      0.5,    2,      1,      0.5,    1,      1,      2,      0.5,        1,      1,      1,      1   ],
+    # Poison
+    [ 1,        1,          1,      0.5,    0.5,    0.5,    1,      0.5,    0,      1,      1,      2,      1,          1,      1,      1,      1   ],
+    # Ground
+    [ 1,        1,          0,      2,      1,      2,      0.5,    1,      2,      2,      1,      0.5,    2,          1,      1,      1,      1   ],
+    # Rock
+    [ 1,        0.5,        2,      1,      0.5,    1,      2,      1,      0.5,    2,      1,      1,      1,          1,      2,      1,      1   ],
+    # Bug
+    [ 1,        0.5,        0.5,    0.5,    1,      1,      1,      0.5,    0.5,    0.5,    1,      2,      1,          2,      1,      1,      2   ],
+    # Ghost
+    [ 0,        1,          1,      1,      1,      1,      1,      2,      0.5,    1,      1,      1,      1,          2,      1,      1,      0.5 ],
+    # Steel
+    [ 1,        1,          1,      1,      1,      2,      1,      1,      0.5,    0.5,    0.5,    1,      0.5,        1,      2,      1,      1   ],
+    # Fire
+    [ 1,        1,          1,      1,      1,      0.5,    2,      1,      2,      0.5,    0.5,    2,      1,          1,      2,      0.5,    1   ],
+    # Water
+    [ 1,        1,          1,      1,      2,      2,      1,      1,      1,      2,      0.5,    0.5,    1,          1,      1,      0.5,    1   ],
+    # Grass
+    [ 1,        1,          0.5,    0.5,    2,      2,      0.5,    1,      0.5,    0.5,    2,      0.5,    1,          1,      1,      0.5,    1   ],
+    # Electric
+    [ 1,        1,          2,      1,      0,      1,      1,      1,      1,      1,      2,      0.5,    0.5,        1,      1,      0.5,    1   ],
+    # Psychic
+    [ 1,        2,          1,      2,      1,      1,      1,      1,      0.5,    1,      1,      1,      1,          0.5,    1,      1,      0   ],
+    # Ice
+    [ 1,        1,          2,      1,      2,      1,      1,      1,      0.5,    0.5,    0.5,    2,      1,          1,      0.5,    2,      1   ],
+    # Dragon
+    [ 1,        1,          1,      1,      1,      1,      1,      1,      0.5,    1,      1,      1,      1,          1,      1,      2,      1   ],
+    # Dark
+    [ 1,        0.5,        1,      1,      1,      1,      1,      2,      0.5,    1,      1,      1,      1,          2,      1,      1,      0.5 ]
+]
+
+
+# clefairy as pokeapi has it now, with its generation 5 and earlier typing in past_types
+CLEFAIRY = {
+    "id": 35, "name": "clefairy",
+    "types": [{"slot": 1, "type": {"name": "fairy", "url": ""}}],
+    "past_types": [{"generation": {"name": "generation-v", "url": ""}, "types": [{"slot": 1, "type": {"name": "normal", "url": ""}}]}],
+}
+
+
+def multiplier(generation: int, attack: PokeType, defender: PokeType) -> float:
+    return get_generation(generation).type_chart_list[attack.value][defender.value]
+
+
+def test_gen_1_ghost_doesnt_affect_psychic():
+    assert multiplier(1, PokeType.GHOST, PokeType.PSYCHIC) == 0
+    assert multiplier(2, PokeType.GHOST, PokeType.PSYCHIC) == 2
+
+
+@pytest.mark.parametrize("attack", [PokeType.GHOST, PokeType.DARK])
+def test_steel_stops_resisting_ghost_and_dark_in_gen_6(attack):
+    assert multiplier(5, attack, PokeType.STEEL) == 0.5
+    assert multiplier(6, attack, PokeType.STEEL) == 1
+
+
+def test_types_a_generation_doesnt_have_are_neutral():
+    for t in (PokeType.DARK, PokeType.STEEL, PokeType.FAIRY):
+        assert all(m == 1 for m in get_generation(1).type_chart_list[t.value])
+        assert all(row[t.value] == 1 for row in get_generation(1).type_chart_list)
+
+
+@pytest.mark.parametrize("generation", [2, 3, 4, 5])
+def test_gen_2_to_5_chart_matches_the_old_chart(generation):
+    chart = get_generation(generation).type_chart_list
+    assert [row[:len(OLD_TYPE_CHART)] for row in chart[:len(OLD_TYPE_CHART)]] == OLD_TYPE_CHART
+    assert all(m == 1 for m in chart[PokeType.FAIRY.value]) and all(row[PokeType.FAIRY.value] == 1 for row in chart)
+
+
+def test_gen_3_pokemon_keep_the_old_17_entry_type_chart():
+    for type1 in list(PokeType)[:len(OLD_TYPE_CHART)]:
+        for type2 in [None] + list(PokeType)[:len(OLD_TYPE_CHART)]:
+            chart = Pokemon(1, "x", type1, type2, 3).get_type_chart()
+            expected = tuple(row[type1.value] * (1 if type2 is None else row[type2.value]) for row in OLD_TYPE_CHART)
+            assert chart == expected
+    assert Pokemon(1, "x", PokeType.DRAGON, None, 3).get_type_effectiveness(PokeType.FAIRY) == 1
+    assert len(Pokemon(1, "x", PokeType.DRAGON, None, 6).get_type_chart()) == NUM_TYPES
+
+
+def test_mixed_generation_type_charts_are_padded():
+    pokemon = [Pokemon(1, "x", PokeType.DRAGON, None, 3), Pokemon(1, "x", PokeType.DRAGON, None, 6)]
+    charts = get_type_charts(pokemon)
+    assert charts.shape == (2, NUM_TYPES)
+    assert charts[:, PokeType.FAIRY.value].tolist() == [1, 2]
+
+
+def test_clefairy_becomes_fairy_in_gen_6():
+    pokelookup = PokeLookup(load=False)
+    assert pokelookup._resolve_types(CLEFAIRY, 1) == (PokeType.NORMAL, None)
+    assert pokelookup._resolve_types(CLEFAIRY, 5) == (PokeType.NORMAL, None)
+    assert pokelookup._resolve_types(CLEFAIRY, 6) == (PokeType.FAIRY, None)
+    assert pokelookup._resolve_types(CLEFAIRY, 9) == (PokeType.FAIRY, None)